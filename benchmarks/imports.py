@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+"""
+Benchmark of process startup with many settings groups.
+
+Generates an app with N modules declaring a settings group each and measures
+in fresh processes:
+- import of the package, which used to import the registry and value types
+  (``before``), and is lazy now (``after``);
+- ``django.setup()`` followed by a read of one setting default, with eager
+  autodiscovery (``before``) and with ``DJSETTINGS_AUTODISCOVER_MANIFEST`` (``after``).
+
+Import of Django itself is not measured.
+
+Usage: python benchmarks/imports.py [number_of_groups]
+"""
+import os
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SETTINGS = '''
+SECRET_KEY = 'benchmark'
+INSTALLED_APPS = ['djsettings', 'bench_app']
+DATABASES = {'default': {'ENGINE': 'django.db.backends.sqlite3', 'NAME': ':memory:'}}
+CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+DJSETTINGS_AUTODISCOVER_MANIFEST = os.environ.get('BENCH_MANIFEST')
+'''
+
+GROUP = '''
+from djsettings import djsetting, DjSettingsGroup, values
+
+
+@djsetting.register
+class BenchmarkSettings{i}(DjSettingsGroup):
+    bench_boolean_{i} = values.BooleanValue(default=True)
+    bench_string_{i} = values.StringValue(default='benchmark string')
+    bench_integer_{i} = values.IntegerValue(default=10)
+    bench_float_{i} = values.FloatValue(default=10.25)
+    bench_decimal_{i} = values.DecimalValue(default=decimal.Decimal('10.25'))
+'''
+
+# Django itself is imported before measuring, its import time is the same in both cases
+IMPORT = '''
+import time
+import django.utils.module_loading
+start = time.perf_counter()
+import {module}
+print(time.perf_counter() - start)
+'''
+
+SETUP = '''
+import time
+import django.apps
+start = time.perf_counter()
+django.setup()
+from djsettings import djsetting
+djsetting.get_setting('bench_integer_0').default
+print(time.perf_counter() - start)
+'''
+
+
+def generate_app(directory, number):
+    app = os.path.join(directory, 'bench_app')
+    os.makedirs(os.path.join(app, 'groups'))
+
+    for path in ('__init__.py', os.path.join('groups', '__init__.py')):
+        open(os.path.join(app, path), 'w').close()
+
+    with open(os.path.join(directory, 'bench_settings.py'), 'w') as f:
+        f.write('import os\n' + SETTINGS)
+
+    with open(os.path.join(app, 'djsettings.py'), 'w') as f:
+        for i in range(number):
+            f.write(f'from .groups import group_{i}  # noqa\n')
+
+    for i in range(number):
+        with open(os.path.join(app, 'groups', f'group_{i}.py'), 'w') as f:
+            f.write('import decimal\n' + GROUP.format(i=i))
+
+
+def run(code, directory, repeat=5, **env):
+    env = {
+        **os.environ,
+        'PYTHONPATH': os.pathsep.join([directory, ROOT]),
+        'DJANGO_SETTINGS_MODULE': 'bench_settings',
+        **env,
+    }
+    # best of several runs, after bytecode of generated modules is cached
+    subprocess.check_output([sys.executable, '-c', code], env=env)
+    return min(float(subprocess.check_output([sys.executable, '-c', code], env=env)) for _ in range(repeat))
+
+
+def main(number):
+    with tempfile.TemporaryDirectory() as directory:
+        generate_app(directory, number)
+
+        manifest = os.path.join(directory, 'manifest.json')
+        subprocess.check_call([sys.executable, '-m', 'django', 'djsettings_manifest', manifest],
+                              stdout=subprocess.DEVNULL,
+                              env={**os.environ, 'PYTHONPATH': os.pathsep.join([directory, ROOT]),
+                                   'DJANGO_SETTINGS_MODULE': 'bench_settings'})
+
+        import_before = run(IMPORT.format(module='djsettings.registries'), directory)
+        import_after = run(IMPORT.format(module='djsettings'), directory)
+        setup_before = run(SETUP, directory)
+        setup_after = run(SETUP, directory, BENCH_MANIFEST=manifest)
+
+    print(f'{number} groups, {number * 5} settings')
+    print(f'{"":<30}{"before, ms":>15}{"after, ms":>15}')
+    print(f'{"import djsettings":<30}{import_before * 1000:>15,.1f}{import_after * 1000:>15,.1f}')
+    print(f'{"setup and first read":<30}{setup_before * 1000:>15,.1f}{setup_after * 1000:>15,.1f}')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+"""
+Benchmark of memory held by registered settings.
+
+Reports bytes allocated per setting for declaring and registering groups
+of settings, and additionally after every setting was read once and
+the admin form was built.
+
+Usage: python benchmarks/memory.py [number_of_groups]
+"""
+import decimal
+import gc
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def declare_groups(number):
+    from djsettings import DjSettingsGroup, values
+    from djsettings.registries import DjSettingsRegistry
+
+    registry = DjSettingsRegistry()
+
+    for i in range(number):
+        registry.register(type(f'BenchmarkSettings{i}', (DjSettingsGroup,), {
+            '__module__': __name__,
+            f'bench_boolean_{i}': values.BooleanValue(default=True),
+            f'bench_string_{i}': values.StringValue(default='benchmark string', max_length=100),
+            f'bench_decimal_{i}': values.DecimalValue(default=decimal.Decimal('10.25')),
+            f'bench_integer_{i}': values.IntegerValue(default=10),
+            f'bench_float_{i}': values.FloatValue(default=10.25),
+        }))
+
+    return registry
+
+
+def allocated(func):
+    gc.collect()
+    before = tracemalloc.take_snapshot()
+    result = func()
+    gc.collect()
+    after = tracemalloc.take_snapshot()
+    return result, sum(stat.size_diff for stat in after.compare_to(before, 'filename'))
+
+
+def main(number):
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'tests.settings')
+
+    import django
+    django.setup()
+
+    from django.core.management import call_command
+
+    from djsettings.forms import DjSettingsForm
+
+    call_command('migrate', verbosity=0)
+
+    tracemalloc.start()
+
+    registry, declared = allocated(lambda: declare_groups(number))
+    settings_number = len(registry.get_settings())
+
+    class BenchmarkForm(DjSettingsForm):
+        pass
+
+    BenchmarkForm.registry = registry
+
+    def use():
+        registry.as_dict()
+        BenchmarkForm()
+
+    _, used = allocated(use)
+
+    print(f'{settings_number} settings')
+    print(f'{"declared, bytes per setting":<40}{declared / settings_number:>10,.0f}')
+    print(f'{"read and edited, bytes per setting":<40}{(declared + used) / settings_number:>10,.0f}')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+"""
+Micro-benchmark of settings reads for every value type.
+
+Compares reads which parse the raw value on every access (``before``)
+with reads which parse the raw value once per change (``after``).
+Process-local cache is enabled, so parsing is not hidden behind
+the shared cache round trip.
+
+Usage: python benchmarks/reads.py [number_of_reads]
+"""
+import decimal
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def main(number):
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'tests.settings')
+
+    import django
+    django.setup()
+
+    from django.contrib.auth.models import User
+    from django.core.management import call_command
+    from django.test import override_settings
+
+    from djsettings import djsetting, DjSettingsGroup, values
+
+    call_command('migrate', verbosity=0)
+
+    user = User.objects.create_user('benchmark')
+
+    class BenchmarkSettings(DjSettingsGroup):
+        bench_boolean = values.BooleanValue(default=True)
+        bench_string = values.StringValue(default='benchmark string')
+        bench_decimal = values.DecimalValue(default=decimal.Decimal('10.25'))
+        bench_integer = values.IntegerValue(default=10)
+        bench_float = values.FloatValue(default=10.25)
+        bench_model_choice = values.ModelChoiceValue(queryset=User.objects.all(), default=user)
+
+    djsetting.register(BenchmarkSettings)
+
+    # Defaults are served without parsing, store values to measure reads of stored values
+    djsetting.set_many({
+        'bench_boolean': False,
+        'bench_string': 'stored benchmark string',
+        'bench_decimal': decimal.Decimal('20.25'),
+        'bench_integer': 20,
+        'bench_float': 20.25,
+        'bench_model_choice': User.objects.create_user('benchmark stored'),
+    })
+
+    print(f'{"value type":<20}{"before, reads/s":>20}{"after, reads/s":>20}')
+
+    with override_settings(DJSETTINGS_LOCAL_CACHE=True):
+        for setting in BenchmarkSettings._meta.settings:
+            name = setting.name
+            cache_decoded_value = setting.cache_decoded_value
+
+            # warm up cache
+            getattr(djsetting, name)
+
+            setting.cache_decoded_value = False
+            before = timeit.timeit(lambda: getattr(djsetting, name), number=number)
+
+            setting.cache_decoded_value = cache_decoded_value
+            after = timeit.timeit(lambda: getattr(djsetting, name), number=number)
+
+            print(f'{setting.__class__.__name__:<20}{number / before:>20,.0f}{number / after:>20,.0f}')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10000)
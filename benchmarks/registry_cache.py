@@ -0,0 +1,81 @@
+#!/usr/bin/env python
+"""
+Benchmark of reading all settings once per request.
+
+Compares per-setting cache lookups (``before``) with ``DJSETTINGS_REGISTRY_CACHE``
+(``after``), which serves reads from an in-process copy validated with one
+generation request per Django request. Counts requests to Django cache per
+Django request and measures requests per second with locmem cache, so the time
+doesn't include network round trips the counted requests cost in production.
+
+Usage: python benchmarks/registry_cache.py [number_of_settings] [number_of_requests]
+"""
+import os
+import sys
+import time
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def measure(number):
+    from django.core.cache import caches
+    from django.core.signals import request_started
+
+    from djsettings import djsetting
+
+    cache = caches['default']
+    calls = []
+
+    def counted(method):
+        def wrapper(*args, **kwargs):
+            calls.append(method.__name__)
+            return method(*args, **kwargs)
+        return wrapper
+
+    # warm up caches
+    request_started.send(sender=None)
+    djsetting.as_dict()
+
+    with mock.patch.multiple(cache, get=counted(cache.get), get_many=counted(cache.get_many)):
+        start = time.perf_counter()
+        for _ in range(number):
+            request_started.send(sender=None)
+            for setting in djsetting.get_settings():
+                getattr(djsetting, setting.name)
+        elapsed = time.perf_counter() - start
+
+    return number / elapsed, len(calls) / number
+
+
+def main(number_of_settings, number_of_requests):
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'tests.settings')
+
+    import django
+    django.setup()
+
+    from django.core.management import call_command
+    from django.test import override_settings
+
+    from djsettings import djsetting, DjSettingsGroup, values
+
+    call_command('migrate', verbosity=0)
+
+    djsetting.register(type('BenchmarkSettings', (DjSettingsGroup,), {
+        '__module__': __name__,
+        **{f'bench_integer_{i}': values.IntegerValue(default=i) for i in range(number_of_settings)},
+    }))
+    djsetting.set_many({f'bench_integer_{i}': i + 1 for i in range(number_of_settings)})
+
+    before = measure(number_of_requests)
+    with override_settings(DJSETTINGS_REGISTRY_CACHE=True):
+        after = measure(number_of_requests)
+
+    print(f'{"":<24}{"before":>12}{"after":>12}')
+    print(f'{"requests/s":<24}{before[0]:>12,.0f}{after[0]:>12,.0f}')
+    print(f'{"cache calls/request":<24}{before[1]:>12,.0f}{after[1]:>12,.0f}')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100,
+         int(sys.argv[2]) if len(sys.argv) > 2 else 1000)
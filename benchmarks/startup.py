@@ -0,0 +1,81 @@
+#!/usr/bin/env python
+"""
+Benchmark of declaring and registering settings groups at startup.
+
+Compares eager validation of defaults on value type creation (``before``)
+with ``DJSETTINGS_LAZY_VALIDATION`` (``after``). Every group has one setting
+of every value type, including ``ModelChoiceValue``, whose default validation
+queries the database.
+
+Usage: python benchmarks/startup.py [number_of_groups]
+"""
+import decimal
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def declare_groups(number, default_user):
+    from django.contrib.auth.models import User
+    from djsettings import DjSettingsGroup, values
+    from djsettings.registries import DjSettingsRegistry
+
+    registry = DjSettingsRegistry()
+
+    for i in range(number):
+        registry.register(type(f'BenchmarkSettings{i}', (DjSettingsGroup,), {
+            '__module__': __name__,
+            f'bench_boolean_{i}': values.BooleanValue(default=True),
+            f'bench_string_{i}': values.StringValue(default='benchmark string'),
+            f'bench_decimal_{i}': values.DecimalValue(default=decimal.Decimal('10.25')),
+            f'bench_integer_{i}': values.IntegerValue(default=10),
+            f'bench_float_{i}': values.FloatValue(default=10.25),
+            f'bench_model_choice_{i}': values.ModelChoiceValue(queryset=User.objects.all(), default=default_user),
+        }))
+
+    return registry
+
+
+def measure(number, default_user):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    with CaptureQueriesContext(connection) as queries:
+        start = time.perf_counter()
+        registry = declare_groups(number, default_user)
+        elapsed = time.perf_counter() - start
+
+    for group_cls in registry._get_registered_group_classes():
+        registry.unregister(group_cls)
+
+    return elapsed, len(queries)
+
+
+def main(number):
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'tests.settings')
+
+    import django
+    django.setup()
+
+    from django.contrib.auth.models import User
+    from django.core.management import call_command
+    from django.test import override_settings
+
+    call_command('migrate', verbosity=0)
+
+    default_user = User.objects.create_user('benchmark')
+
+    before, before_queries = measure(number, default_user)
+    with override_settings(DJSETTINGS_LAZY_VALIDATION=True):
+        after, after_queries = measure(number, default_user)
+
+    print(f'{number} groups, {number * 6} settings')
+    print(f'{"":<10}{"before":>15}{"after":>15}')
+    print(f'{"time, ms":<10}{before * 1000:>15,.1f}{after * 1000:>15,.1f}')
+    print(f'{"queries":<10}{before_queries:>15}{after_queries:>15}')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
@@ -1,15 +1,44 @@
 from django.utils.module_loading import autodiscover_modules
 
-from djsettings.registries import djsetting
-from djsettings.groups import DjSettingsGroup
-
 
 __all__ = [
     'DjSettingsGroup', 'djsetting'
 ]
 
 
+def __getattr__(name):
+    # Registry and value types are imported on first use, so importing the package stays cheap
+    if name == 'djsetting':
+        from .registries import djsetting
+        return djsetting
+
+    if name == 'DjSettingsGroup':
+        from .groups import DjSettingsGroup
+        return DjSettingsGroup
+
+    raise AttributeError(f'module "{__name__}" has no attribute "{name}"')
+
+
+def __dir__():
+    return sorted([*globals(), *__all__])
+
+
 def autodiscover():
+    """
+    Import djsettings modules of installed apps.
+
+    With ``DJSETTINGS_AUTODISCOVER_MANIFEST`` modules are imported on first access
+    of settings declared in them instead.
+    """
+    from .conf import settings
+
+    if settings.AUTODISCOVER_MANIFEST:
+        from .manifests import load_manifest
+        from .registries import djsetting
+
+        if load_manifest(settings.AUTODISCOVER_MANIFEST, djsetting):
+            return
+
     autodiscover_modules('djsettings')
 
 
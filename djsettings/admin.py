@@ -10,7 +10,6 @@ from django.core.exceptions import PermissionDenied
 
 from .models import DjSetting
 from .forms import DjSettingsForm
-from .registries import djsetting
 
 
 @admin.register(DjSetting)
@@ -61,13 +60,17 @@ class DjSettingAdmin(admin.ModelAdmin):
             form = self.change_list_form(request.POST, request.FILES)
 
             if form.is_valid():
-                form.save()
-                messages.add_message(request, messages.SUCCESS, _('DjSettings updated successfully.'))
+                if form.save():
+                    messages.add_message(request, messages.SUCCESS, _('DjSettings updated successfully.'))
+                else:
+                    messages.add_message(request, messages.ERROR,
+                                         _('DjSettings were changed by someone else, review the current values.'))
+                    form = self.change_list_form()
 
         fieldsets = (Fieldset(form,
                               name=group._meta.verbose_name,
                               fields=[setting.name for setting in group._meta.settings])
-                     for group in djsetting.get_all_setting_groups())
+                     for group in form.registry.get_all_setting_groups())
 
         context = dict(
             self.admin_site.each_context(request),
@@ -1,9 +1,23 @@
 from django.apps import AppConfig
 
+from .conf import settings
+
 
 class DjSettingsConfig(AppConfig):
     name = 'djsettings'
     verbose_name = 'DjSettings'
 
     def ready(self):
+        from . import checks
+
         self.module.autodiscover()
+
+        if settings.SNAPSHOT_FILE:
+            from .snapshots import load_snapshot_file, start_reconciler
+            # Background refresh replaces the loaded snapshot itself
+            if load_snapshot_file(settings.SNAPSHOT_FILE) and not settings.REFRESH_INTERVAL:
+                start_reconciler(settings.SNAPSHOT_FILE, settings.SNAPSHOT_FILE_RETRY_INTERVAL)
+
+        if settings.REFRESH_INTERVAL:
+            from .snapshots import start_refresher
+            start_refresher(settings.REFRESH_INTERVAL)
@@ -0,0 +1,23 @@
+import asyncio
+import contextvars
+import functools
+
+try:
+    from asgiref.sync import sync_to_async
+except ImportError:
+    sync_to_async = None
+
+
+async def sync_to_thread(func, *args, **kwargs):
+    """
+    Run blocking function in a worker thread and return its result.
+
+    asgiref ``sync_to_async`` is used when it is installed, so database access follows
+    Django async safety rules. Otherwise function runs in default executor of the loop.
+    """
+    if sync_to_async is not None:
+        return await sync_to_async(func)(*args, **kwargs)
+
+    loop = asyncio.get_event_loop()
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(None, functools.partial(context.run, func, *args, **kwargs))
@@ -0,0 +1,169 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings as django_settings
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.core.signals import setting_changed
+
+from .conf import settings
+
+
+_unset = object()
+
+
+def validate_cache_options(alias=None, timeout=DEFAULT_TIMEOUT):
+    """Raise ValueError if cache alias is not configured or cache timeout is invalid."""
+    if alias is not None and alias not in django_settings.CACHES:
+        raise ValueError(f'Cache "{alias}" is not configured in CACHES setting')
+
+    if timeout is not DEFAULT_TIMEOUT and timeout is not None:
+        if isinstance(timeout, bool) or not isinstance(timeout, (int, float)) or timeout < 0:
+            raise ValueError(f'Invalid cache timeout "{timeout}", must be None or non-negative number of seconds')
+
+
+class LocalCache:
+    """
+    Bounded process-local cache with LRU eviction and per-entry timeout.
+
+    Used in front of Django cache to serve repeated settings reads
+    without a round trip to the shared cache backend.
+    """
+
+    def __init__(self, max_size, timeout):
+        self.max_size = max_size
+        self.timeout = timeout
+        self.generation = None
+
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                expires_at, value = self._data[key]
+            except KeyError:
+                return default
+
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._data[key]
+                return default
+
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        expires_at = None if self.timeout is None else time.monotonic() + self.timeout
+
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def validate(self, generation):
+        """Clear cache if its entries were cached at other settings generation."""
+        with self._lock:
+            if generation != self.generation:
+                self._data.clear()
+                self.generation = generation
+
+    def advance(self, generation):
+        """
+        Set generation increased by change made in this process.
+
+        Entries are kept, unless other changes were made since cache was validated.
+        """
+        with self._lock:
+            if self.generation is not None and generation != self.generation + 1:
+                self._data.clear()
+            self.generation = generation
+
+    def __len__(self):
+        return len(self._data)
+
+    def __repr__(self):
+        return f'<{self.__class__.__name__} object>'
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls with the same key within a process.
+
+    The first caller runs the function, callers arriving while it runs
+    wait for it and get the same result.
+    """
+
+    class Call:
+        def __init__(self):
+            self.event = threading.Event()
+            self.result = None
+            self.error = None
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, func):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = self.Call()
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func()
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+
+        return call.result
+
+    def __repr__(self):
+        return f'<{self.__class__.__name__} object>'
+
+
+_local_cache = _unset
+
+
+def get_local_cache():
+    """Return process-local cache or None when it is disabled."""
+    global _local_cache
+
+    if _local_cache is _unset:
+        if settings.LOCAL_CACHE:
+            _local_cache = LocalCache(max_size=settings.LOCAL_CACHE_MAX_SIZE,
+                                      timeout=settings.LOCAL_CACHE_TIMEOUT)
+        else:
+            _local_cache = None
+
+    return _local_cache
+
+
+def _reset_local_cache(setting, **kwargs):
+    global _local_cache
+
+    if setting.startswith('DJSETTINGS_LOCAL_CACHE'):
+        _local_cache = _unset
+
+
+setting_changed.connect(_reset_local_cache, dispatch_uid='djsettings.caches._reset_local_cache')
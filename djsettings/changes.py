@@ -0,0 +1,122 @@
+import threading
+import time
+
+from .conf import settings
+from .storages import expand_stored_values
+
+
+def record_changes(raw_values):
+    """Write changes of raw values by setting names to change log. None raw value means deleted setting."""
+    from .models import DjSettingChange
+
+    DjSettingChange.objects.bulk_create([DjSettingChange(name=name, raw_value=raw_value)
+                                         for name, raw_value in raw_values.items()])
+
+
+def get_changes(since_id=0, ids=()):
+    """Return list of (id, name, raw value) changes made after given change id or with given ids."""
+    from django.db.models import Q
+    from .models import DjSettingChange
+
+    query = Q(id__gt=since_id)
+    if ids:
+        query |= Q(id__in=ids)
+
+    return list(DjSettingChange.objects.filter(query).order_by('id').values_list('id', 'name', 'raw_value'))
+
+
+def delete_old_changes(before):
+    """Delete change log entries created before given datetime."""
+    from .models import DjSettingChange
+
+    DjSettingChange.objects.filter(created__lt=before).delete()
+
+
+class ChangeLogReplica:
+    """
+    In-memory copy of raw values of all settings stored in database.
+
+    First refresh loads all settings, following refreshes fetch only
+    changes made since the last seen change with one indexed range query.
+
+    Change ids are assigned when rows are inserted, but transactions may commit
+    out of order. Skipped ids, including ids missing below the last change on load,
+    are therefore fetched again on following refreshes until they appear
+    or ``DJSETTINGS_CHANGES_GAP_TIMEOUT`` seconds pass.
+    """
+
+    max_gaps = 1000
+
+    def __init__(self):
+        self.raw_values = {}
+        self.last_change_id = None
+
+        self._applied_ids = {}
+        self._gaps = {}
+        self._lock = threading.Lock()
+
+    def refresh(self):
+        """Fetch changes from database. Return True if any raw value changed."""
+        with self._lock:
+            if self.last_change_id is None:
+                return self._load()
+            return self._apply(get_changes(self.last_change_id, self._gaps.keys()))
+
+    def _load(self):
+        from .models import DjSetting, DjSettingChange
+
+        # Changes made while loading are applied again on next refresh
+        self.last_change_id = DjSettingChange.objects.order_by('-id').values_list('id', flat=True).first() or 0
+
+        # Changes below the last id may still be uncommitted, so ids missing
+        # from the recent window are fetched as gaps on following refreshes
+        first_id = max(self.last_change_id - self.max_gaps, 0) + 1
+        recent_changes = list(DjSettingChange.objects.filter(id__gte=first_id, id__lte=self.last_change_id)
+                              .order_by('id').values_list('id', 'name'))
+
+        self._applied_ids = {name: change_id for change_id, name in recent_changes}
+        recent_ids = {change_id for change_id, _ in recent_changes}
+        now = time.monotonic()
+        self._gaps = {gap_id: now for gap_id in range(first_id, self.last_change_id) if gap_id not in recent_ids}
+
+        self.raw_values = expand_stored_values(dict(DjSetting.objects.values_list('name', 'raw_value')))
+        return True
+
+    def _apply(self, changes):
+        now = time.monotonic()
+        raw_values = None
+
+        for change_id, name, raw_value in changes:
+            self._gaps.pop(change_id, None)
+
+            if change_id > self.last_change_id:
+                if change_id - self.last_change_id <= self.max_gaps:
+                    for gap_id in range(self.last_change_id + 1, change_id):
+                        self._gaps[gap_id] = now
+                self.last_change_id = change_id
+
+            # Change fetched late must not override newer change of the same setting
+            if change_id <= self._applied_ids.get(name, 0):
+                continue
+            self._applied_ids[name] = change_id
+
+            if raw_values is None:
+                raw_values = dict(self.raw_values)
+
+            if raw_value is None:
+                raw_values.pop(name, None)
+            else:
+                raw_values[name] = raw_value
+
+        expired = now - settings.CHANGES_GAP_TIMEOUT
+        self._gaps = {gap_id: seen for gap_id, seen in self._gaps.items() if seen > expired}
+
+        if raw_values is None:
+            return False
+
+        # Replace dict instead of updating it, so readers always see consistent copy
+        self.raw_values = raw_values
+        return True
+
+    def __repr__(self):
+        return f'<{self.__class__.__name__} object>'
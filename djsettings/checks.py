@@ -0,0 +1,28 @@
+from django.core import checks
+from django.db import DatabaseError
+
+from .exceptions import InvalidDefaultSettingValue
+
+
+@checks.register('djsettings')
+def check_defaults(app_configs, **kwargs):
+    """Validate default values of registered settings, which are not validated yet."""
+    from .registries import get_registered_settings
+
+    errors = []
+
+    for setting in get_registered_settings():
+        try:
+            setting.validate_default()
+        except InvalidDefaultSettingValue as e:
+            errors.append(checks.Error(
+                f'Invalid default value of setting "{setting.full_name}": {e}',
+                obj=setting.group,
+                id='djsettings.E001',
+            ))
+        except DatabaseError:
+            # Defaults validated against database (e.g. of ModelChoiceValue)
+            # are checked on first use when database is not ready yet
+            pass
+
+    return errors
@@ -0,0 +1,47 @@
+from django.conf import settings as django_settings
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+
+
+DEFAULTS = {
+    'CACHE_ALIAS': 'default',
+    'CACHE_TIMEOUT': DEFAULT_TIMEOUT,
+    'CACHE_KEY_PREFIX': 'djsettings_',
+    'CACHE_VERSION': None,
+    'LOCAL_CACHE': False,
+    'LOCAL_CACHE_TIMEOUT': 5,
+    'LOCAL_CACHE_MAX_SIZE': 1024,
+    'MISS_LOCK': False,
+    'MISS_LOCK_TIMEOUT': 5,
+    'MISS_LOCK_WAIT_INTERVAL': 0.05,
+    'CHANGES_GAP_TIMEOUT': 60,
+    'REFRESH_INTERVAL': None,
+    'LAZY_VALIDATION': False,
+    'AUTODISCOVER_MANIFEST': None,
+    'REGISTRY_CACHE': False,
+    'REGISTRY_CACHE_TIMEOUT': 5,
+    'SHARED_SNAPSHOT_PATH': None,
+    'SHARED_SNAPSHOT_CHECK_INTERVAL': 1,
+    'SHARED_SNAPSHOT_MAX_AGE': 60,
+    'SNAPSHOT_FILE': None,
+    'SNAPSHOT_FILE_RETRY_INTERVAL': 5,
+}
+
+
+class Settings:
+    """
+    DjSettings options read from Django settings.
+
+    Every option can be overridden in Django settings with ``DJSETTINGS_`` prefix,
+    e.g. ``DJSETTINGS_LOCAL_CACHE = True``.
+    """
+
+    def __getattr__(self, name):
+        if name not in DEFAULTS:
+            raise AttributeError(f'Invalid djsettings option: "{name}"')
+        return getattr(django_settings, f'DJSETTINGS_{name}', DEFAULTS[name])
+
+    def __repr__(self):
+        return f'<{self.__class__.__name__} object>'
+
+
+settings = Settings()
@@ -0,0 +1,200 @@
+import json
+import logging
+import os
+import struct
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from types import MappingProxyType
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None
+
+
+logger = logging.getLogger('djsettings')
+
+HEADER = struct.Struct('<4sQQ')
+MAGIC = b'DJS1'
+
+
+class SnapshotFile:
+    """
+    File with raw values of settings by names and generation they were taken at.
+
+    File starts with header of magic bytes, generation and payload length followed
+    by compact JSON payload. It is written to a temporary file renamed over the old one,
+    so readers never see partially written file.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def read(self):
+        """Return tuple of generation and raw values or None if file doesn't exist. Raise ValueError if invalid."""
+        try:
+            with open(self.path, 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+
+        generation, length = self._unpack_header(data)
+        if HEADER.size + length != len(data):
+            raise ValueError(f'Settings snapshot file "{self.path}" is truncated')
+        return generation, json.loads(data[HEADER.size:])
+
+    def read_generation(self):
+        """Return generation from file header or None if file doesn't exist or is invalid."""
+        try:
+            with open(self.path, 'rb') as f:
+                return self._unpack_header(f.read(HEADER.size))[0]
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def write(self, generation, raw_values):
+        payload = json.dumps(raw_values, separators=(',', ':')).encode()
+        directory = os.path.dirname(os.path.abspath(self.path))
+
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.djsettings-')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(HEADER.pack(MAGIC, generation, len(payload)))
+                f.write(payload)
+                f.flush()
+                os.fsync(f.fileno())
+            os.chmod(tmp_path, 0o644)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def publish(self, generation, raw_values, force=False):
+        """
+        Write snapshot unless file has the same or newer generation, return whether it was written.
+
+        Writers on the host are serialized with a lock file.
+        """
+        with self._lock():
+            if not force:
+                current_generation = self.read_generation()
+                if current_generation is not None and current_generation >= generation:
+                    return False
+
+            self.write(generation, raw_values)
+            return True
+
+    def touch(self):
+        """Update modification time of the file, so readers know it is up to date, return whether it exists."""
+        try:
+            os.utime(self.path)
+        except FileNotFoundError:
+            return False
+        return True
+
+    def update(self, raw_values):
+        """Apply changed raw values to existing file keeping its generation, return whether it exists."""
+        with self._lock():
+            snapshot = self.read()
+            if snapshot is None:
+                return False
+
+            generation, stored_raw_values = snapshot
+            self.write(generation, {**stored_raw_values, **raw_values})
+            return True
+
+    @contextmanager
+    def _lock(self):
+        with open(f'{self.path}.lock', 'a') as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            yield
+
+    @staticmethod
+    def _unpack_header(data):
+        if len(data) < HEADER.size:
+            raise ValueError('Settings snapshot file is truncated')
+
+        magic, generation, length = HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise ValueError('Invalid settings snapshot file')
+        return generation, length
+
+    def __repr__(self):
+        return f'<{self.__class__.__name__} object>'
+
+
+class SharedSnapshot:
+    """
+    Snapshot published to a file by one process and read by all processes on the host.
+
+    File is read when it is replaced and checked with one ``stat`` at most every ``check_interval``
+    seconds between reads. With ``max_age``, file not modified for that many seconds is ignored,
+    as its publisher has probably stopped.
+    """
+
+    def __init__(self, path, check_interval, max_age=None):
+        self.file = SnapshotFile(path)
+        self.check_interval = check_interval
+        self.max_age = max_age
+        self.generation = None
+        self.raw_values = None
+
+        self._file_id = None
+        self._checked_at = None
+        self._lock = threading.Lock()
+
+    def get(self, check=True):
+        """Return raw values from the file or None if it is not published. Without ``check`` file is not checked."""
+        if check and self.check_due:
+            self.check()
+        return self.raw_values
+
+    @property
+    def check_due(self):
+        """Whether the file is checked on next ``get``."""
+        checked_at = self._checked_at
+        return checked_at is None or time.monotonic() - checked_at >= self.check_interval
+
+    def check(self):
+        """Read the file again if it was replaced since it was read, ignore it if it is older than ``max_age``."""
+        with self._lock:
+            try:
+                stat = os.stat(self.file.path)
+            except FileNotFoundError:
+                stat = None
+
+            if stat is not None and self.max_age is not None and time.time() - stat.st_mtime > self.max_age:
+                if self._file_id is not None:
+                    logger.warning('Settings snapshot file "%s" was not refreshed for %s seconds, ignoring it',
+                                   self.file.path, self.max_age)
+                stat = None
+
+            # File is always replaced with rename, modification time is updated by publisher
+            file_id = None if stat is None else (stat.st_dev, stat.st_ino, stat.st_size)
+
+            if file_id != self._file_id:
+                snapshot = None
+                if file_id is not None:
+                    # File replaced after stat is read now and again on next check
+                    try:
+                        snapshot = self.file.read()
+                    except ValueError:
+                        logger.warning('Invalid settings snapshot file "%s", ignoring it', self.file.path,
+                                       exc_info=True)
+
+                self.generation, raw_values = (None, None) if snapshot is None else snapshot
+                self.raw_values = None if raw_values is None else MappingProxyType(raw_values)
+                self._file_id = file_id
+
+            self._checked_at = time.monotonic()
+
+    def update(self, raw_values):
+        """Apply raw values changed in this process until the file is replaced."""
+        with self._lock:
+            if self.raw_values is not None:
+                self.raw_values = MappingProxyType({**self.raw_values, **raw_values})
+
+    def __repr__(self):
+        return f'<{self.__class__.__name__} object>'
@@ -1,20 +1,64 @@
+import json
+
 from django import forms
 
 from .registries import djsetting
 
 
+class VersionsField(forms.CharField):
+    """Hidden field with JSON encoded versions of settings by names."""
+    widget = forms.HiddenInput
+
+    def to_python(self, value):
+        if not value:
+            return None
+
+        try:
+            versions = json.loads(value)
+        except ValueError:
+            versions = None
+
+        if not isinstance(versions, dict):
+            raise forms.ValidationError('Invalid settings versions.', code='invalid')
+        return versions
+
+    def prepare_value(self, value):
+        return value if isinstance(value, str) else json.dumps(value)
+
+    def has_changed(self, initial, data):
+        return False
+
+
 class DjSettingsForm(forms.Form):
+    """
+    Form with all registered settings.
+
+    Versions of settings are submitted with the form, so changes made by someone else
+    after the form was rendered are not overwritten.
+    """
+    registry = djsetting
+
+    djsettings_versions = VersionsField(required=False)
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
-        for group in djsetting.get_all_setting_groups():
+        initial = self.registry.as_dict()
+        self.fields['djsettings_versions'].initial = self.registry.get_versions()
+
+        for group in self.registry.get_all_setting_groups():
             for setting in group._meta.settings:
-                if setting.form_field:
-                    self.fields[setting.name] = setting.form_field
-                    self.fields[setting.name].initial = getattr(djsetting, setting.name)
-                    self.fields[setting.name].default = setting.default
+                form_field = setting.form_field
+                if form_field:
+                    form_field.initial = initial[setting.name]
+                    form_field.default = setting.default
+                    self.fields[setting.name] = form_field
 
     def save(self):
-        for group in djsetting.get_all_setting_groups():
-            for setting in group._meta.settings:
-                setattr(djsetting, setting.name, self.cleaned_data[setting.name])
+        """Save changed settings, return False if some of them were changed by someone else meanwhile."""
+        names = self.changed_data
+        versions = self.cleaned_data['djsettings_versions']
+        if versions is not None:
+            versions = {name: versions.get(name, 0) for name in names}
+
+        return self.registry.set_many({name: self.cleaned_data[name] for name in names}, versions)
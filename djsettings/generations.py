@@ -0,0 +1,88 @@
+from django.core.cache import caches
+from django.core.signals import request_started
+from django.db import router, transaction
+from django.db.models import F
+
+from .caches import get_local_cache
+from .conf import settings
+
+
+def _get_cache_key():
+    return f'{settings.CACHE_KEY_PREFIX}:generation'
+
+
+def get_generation():
+    """
+    Return current settings generation.
+
+    Generation is increased on every settings change, so comparing it with
+    previously seen one tells whether anything changed with a single cache request.
+    """
+    from .models import DjSettingsGeneration
+
+    cache = caches[settings.CACHE_ALIAS]
+    generation = cache.get(_get_cache_key(), version=settings.CACHE_VERSION)
+
+    if generation is None:
+        generation = DjSettingsGeneration.objects.values_list('generation', flat=True).first() or 0
+        cache.set(_get_cache_key(), generation, None, version=settings.CACHE_VERSION)
+
+    return generation
+
+
+def bump_generation():
+    """
+    Increase settings generation in database and publish it once current transaction is committed.
+
+    Called in the transaction of the change, so generation of a rolled back change is never published.
+    """
+    from .models import DjSettingsGeneration
+
+    if not DjSettingsGeneration.objects.filter(pk=1).update(generation=F('generation') + 1):
+        generation_obj, created = DjSettingsGeneration.objects.get_or_create(pk=1, defaults={'generation': 1})
+        if not created:
+            DjSettingsGeneration.objects.filter(pk=1).update(generation=F('generation') + 1)
+
+    # Concurrent changes may increase generation further, it only has to differ from previously seen one
+    generation = DjSettingsGeneration.objects.values_list('generation', flat=True).get(pk=1)
+
+    transaction.on_commit(lambda: publish_generation(generation), using=router.db_for_write(DjSettingsGeneration))
+    return generation
+
+
+def publish_generation(generation):
+    """Publish generation committed to database to cache, process-local cache and registry cache."""
+    caches[settings.CACHE_ALIAS].set(_get_cache_key(), generation, None, version=settings.CACHE_VERSION)
+
+    local_cache = get_local_cache()
+    if local_cache is not None:
+        local_cache.advance(generation)
+
+    from .values import ModelChoiceValue
+    ModelChoiceValue.advance_instances(generation)
+
+    # Rebuilt from committed rows, as the copy is only replaced when generation changes again
+    from .snapshots import rebuild_registry_cache
+    rebuild_registry_cache(generation)
+
+
+def validate_local_cache(**kwargs):
+    """
+    Clear process-local cache and cached model instances if settings were changed since they were filled.
+
+    Called on start of every request, processes serving other work (e.g. Celery workers)
+    can call it on start of each task.
+    """
+    from .values import ModelChoiceValue
+
+    local_cache = get_local_cache()
+    if local_cache is None and not ModelChoiceValue.signals_handlers:
+        return
+
+    generation = get_generation()
+    if local_cache is not None:
+        local_cache.validate(generation)
+    ModelChoiceValue.validate_instances(generation)
+
+
+request_started.connect(validate_local_cache, dispatch_uid='djsettings.generations.validate_local_cache')
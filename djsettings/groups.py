@@ -1,5 +1,6 @@
 import copy
 from collections import OrderedDict
+from types import MappingProxyType
 
 from .values import BaseValueType
 from .options import Options
@@ -50,5 +51,8 @@ class DjSettingsGroupMetaclass(type):
 class DjSettingsGroup(metaclass=DjSettingsGroupMetaclass):
     """Group of settings"""
 
+    # Settings bound to registry which created the group instance, by setting names
+    _settings = MappingProxyType({})
+
     def __repr__(self):
         return f'<{self.__class__.__name__} object>'
@@ -1,12 +1,24 @@
 from django.core.management.base import BaseCommand
+from django.db import router, transaction
 
-from djsettings.registries import djsetting
+from djsettings.changes import record_changes
+from djsettings.generations import bump_generation
 from djsettings.models import DjSetting
+from djsettings.registries import get_registered_settings
+from djsettings.storages import expand_stored_values
 
 
 class Command(BaseCommand):
     help = 'Delete old settings from database'
 
     def handle(self, *args, **options):
-        DjSetting.objects.exclude(name__in=dir(djsetting)).delete()
+        with transaction.atomic(using=router.db_for_write(DjSetting)):
+            old_settings = DjSetting.objects.exclude(name__in={setting.storage_name
+                                                               for setting in get_registered_settings()})
+            names = list(expand_stored_values(dict(old_settings.values_list('name', 'raw_value'))))
+            old_settings.delete()
+            record_changes(dict.fromkeys(names))
+
+            if names:
+                bump_generation()
 
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.module_loading import autodiscover_modules
+
+from djsettings.conf import settings
+from djsettings.manifests import write_manifest
+from djsettings.registries import djsetting
+
+
+class Command(BaseCommand):
+    help = 'Write manifest of modules declaring settings, used for lazy autodiscovery'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', nargs='?', default=None,
+                            help='Manifest path, DJSETTINGS_AUTODISCOVER_MANIFEST by default.')
+
+    def handle(self, *args, **options):
+        path = options['path'] or settings.AUTODISCOVER_MANIFEST
+        if not path:
+            raise CommandError('Manifest path is not given and DJSETTINGS_AUTODISCOVER_MANIFEST is not set.')
+
+        # Discover all modules, the current manifest may be outdated
+        djsetting.set_manifest({})
+        autodiscover_modules('djsettings')
+
+        manifest = write_manifest(path, djsetting)
+        self.stdout.write(f'Written {len(manifest["settings"])} settings to {path}')
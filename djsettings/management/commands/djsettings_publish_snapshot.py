@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from djsettings.conf import settings
+from djsettings.snapshots import SharedSnapshotPublisher
+
+
+class Command(BaseCommand):
+    help = 'Publish settings snapshot to a file read by all processes on the host'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', nargs='?', default=None,
+                            help='Snapshot file path, DJSETTINGS_SHARED_SNAPSHOT_PATH by default.')
+        parser.add_argument('--interval', type=float, default=settings.REFRESH_INTERVAL or 5,
+                            help='Seconds between refreshes.')
+        parser.add_argument('--once', action='store_true', default=False,
+                            help='Publish snapshot once and exit.')
+
+    def handle(self, *args, **options):
+        path = options['path'] or settings.SHARED_SNAPSHOT_PATH
+        if not path:
+            raise CommandError('Snapshot path is not given and DJSETTINGS_SHARED_SNAPSHOT_PATH is not set.')
+
+        publisher = SharedSnapshotPublisher(path, options['interval'])
+
+        if options['once']:
+            publisher.refresh()
+            self.stdout.write(f'Published {len(publisher.replica.raw_values)} settings to {path}')
+            return
+
+        self.stdout.write(f'Publishing settings to {path} every {options["interval"]} seconds')
+        publisher.run()
@@ -0,0 +1,87 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import router, transaction
+
+from djsettings.changes import record_changes
+from djsettings.conf import settings as djsettings_settings
+from djsettings.generations import bump_generation
+from djsettings.models import DjSetting
+from djsettings.registries import get_registered_settings
+from djsettings.snapshots import write_snapshot_file
+from djsettings.storages import expand_stored_values
+from djsettings.values import not_stored, save_many_to_cache, _write_group_raw_values
+
+
+class Command(BaseCommand):
+    help = 'Create missing settings with default values in database and warm up cache'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--prune', action='store_true',
+                            help='Delete settings which are not registered from database.')
+        parser.add_argument('--check', action='store_true',
+                            help='Exit with non-zero status if database is out of sync, without making changes.')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Show what would be changed, without making changes.')
+
+    def handle(self, *args, **options):
+        settings = get_registered_settings()
+        stored_values = dict(DjSetting.objects.values_list('name', 'raw_value'))
+
+        missing = [setting for setting in settings
+                   if setting._extract(stored_values.get(setting.storage_name, not_stored)) is not_stored]
+        orphaned = sorted(set(stored_values) - {setting.storage_name for setting in settings})
+
+        if not options['prune']:
+            orphaned = []
+
+        for setting in missing:
+            self.stdout.write(f'Missing: {setting.full_name}')
+        for name in orphaned:
+            self.stdout.write(f'Orphaned: {name}')
+
+        if options['check']:
+            if missing or orphaned:
+                raise CommandError(f'{len(missing)} missing and {len(orphaned)} orphaned settings.')
+            return
+
+        if options['dry_run']:
+            return
+
+        default_raw_values = {setting.full_name: setting.to_db(setting.default) for setting in missing}
+        group_default_raw_values = {}
+        for setting in missing:
+            if setting.storage is not None:
+                storage_raw_values = group_default_raw_values.setdefault(setting.storage, {})
+                storage_raw_values[setting.name] = default_raw_values[setting.full_name]
+
+        with transaction.atomic(using=router.db_for_write(DjSetting)):
+            names = [setting.storage_name for setting in missing if setting.storage is None]
+            DjSetting.objects.bulk_create([DjSetting(name=name, raw_value=default_raw_values[name]) for name in names],
+                                          ignore_conflicts=True)
+
+            # Rows created concurrently since the first select are skipped by the insert, keep their values
+            if names:
+                stored_values.update(DjSetting.objects.filter(name__in=names).values_list('name', 'raw_value'))
+
+            for storage, raw_values in group_default_raw_values.items():
+                stored_values[storage.name] = _write_group_raw_values(storage, raw_values, overwrite=False)
+
+            created_raw_values = {setting.full_name: default_raw_values[setting.full_name] for setting in missing
+                                  if setting._extract(stored_values.get(setting.storage_name, not_stored))
+                                  == default_raw_values[setting.full_name]}
+
+            if orphaned:
+                DjSetting.objects.filter(name__in=orphaned).delete()
+
+            deleted_names = expand_stored_values({name: stored_values.pop(name) for name in orphaned})
+            record_changes({**created_raw_values, **dict.fromkeys(deleted_names)})
+
+            transaction.on_commit(lambda: save_many_to_cache(settings, stored_values),
+                                  using=router.db_for_write(DjSetting))
+            if created_raw_values or orphaned:
+                bump_generation()
+
+        if djsettings_settings.SNAPSHOT_FILE:
+            write_snapshot_file(djsettings_settings.SNAPSHOT_FILE)
+
+        self.stdout.write(f'Created {len(created_raw_values)}, deleted {len(orphaned)} '
+                          f'and cached {len(settings)} settings.')
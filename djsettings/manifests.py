@@ -0,0 +1,54 @@
+import json
+import logging
+from importlib import import_module
+
+
+logger = logging.getLogger('djsettings')
+
+
+def write_manifest(path, registry):
+    """
+    Write JSON manifest of modules declaring registered settings.
+
+    Manifest maps setting names to modules and lists modules declaring ``ModelChoiceValue``
+    settings, which are imported on startup to connect handlers of deleted objects.
+    """
+    from .values import ModelChoiceValue
+
+    settings = registry.get_settings()
+    manifest = {
+        'settings': {setting.name: setting.group.__module__ for setting in settings},
+        'model_choice_modules': sorted({setting.group.__module__ for setting in settings
+                                        if isinstance(setting, ModelChoiceValue)}),
+    }
+
+    with open(path, 'w') as f:
+        json.dump(manifest, f, indent=2)
+
+    return manifest
+
+
+def load_manifest(path, registry):
+    """
+    Set manifest read from path to registry and import modules declaring ``ModelChoiceValue`` settings.
+
+    Return False if manifest file doesn't exist.
+    """
+    try:
+        with open(path) as f:
+            manifest = json.load(f)
+    except FileNotFoundError:
+        logger.warning('Settings manifest "%s" not found, run djsettings_manifest command to create it', path)
+        return False
+
+    if not isinstance(manifest.get('settings'), dict):
+        # Manifest written by older version, mapping setting names to modules only
+        manifest = {'settings': manifest, 'model_choice_modules': sorted(set(manifest.values()))}
+        logger.warning('Settings manifest "%s" is outdated, run djsettings_manifest command to update it', path)
+
+    registry.set_manifest(manifest['settings'])
+
+    for module in manifest['model_choice_modules']:
+        import_module(module)
+
+    return True
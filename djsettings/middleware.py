@@ -0,0 +1,12 @@
+from .snapshots import settings_snapshot
+
+
+class SettingsSnapshotMiddleware:
+    """Fetch all settings once per request and serve them from snapshot for the rest of it."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with settings_snapshot():
+            return self.get_response(request)
@@ -0,0 +1,27 @@
+from django.db import migrations, models
+
+
+def create_generation(apps, schema_editor):
+    DjSettingsGeneration = apps.get_model('djsettings', 'DjSettingsGeneration')
+    DjSettingsGeneration.objects.using(schema_editor.connection.alias).create(pk=1)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('djsettings', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DjSettingsGeneration',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('generation', models.BigIntegerField(default=0, verbose_name='generation')),
+            ],
+            options={
+                'verbose_name': 'Django Settings generation',
+            },
+        ),
+        migrations.RunPython(create_generation, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,24 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('djsettings', '0002_djsettingsgeneration'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DjSettingChange',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('name', models.CharField(max_length=255, verbose_name='name')),
+                ('raw_value', models.TextField(blank=True, null=True, verbose_name='raw value')),
+                ('created', models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='created')),
+            ],
+            options={
+                'verbose_name': 'Django Setting change',
+                'verbose_name_plural': 'Django Setting changes',
+            },
+        ),
+    ]
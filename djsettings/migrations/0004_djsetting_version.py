@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('djsettings', '0003_djsettingchange'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='djsetting',
+            name='version',
+            field=models.PositiveIntegerField(default=1, verbose_name='version'),
+        ),
+    ]
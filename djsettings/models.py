@@ -13,6 +13,9 @@ class DjSetting(models.Model):
     raw_value = models.TextField(_("raw value"),
                                  blank=True)
 
+    version = models.PositiveIntegerField(_("version"),
+                                          default=1)
+
     class Meta:
         app_label = 'djsettings'
         verbose_name = _("Django Setting")
@@ -31,3 +34,40 @@ class DjSetting(models.Model):
     #     value_instance = djsetting.get_setting(self.name)
     #     value_instance.validate(value)
     #     self.raw_value = value_instance.to_db(value)
+
+
+class DjSettingsGeneration(models.Model):
+    """Single row with counter increased on every settings change."""
+    generation = models.BigIntegerField(_("generation"),
+                                        default=0)
+
+    class Meta:
+        app_label = 'djsettings'
+        verbose_name = _("Django Settings generation")
+
+    def __str__(self):
+        return f"generation {self.generation}"
+
+
+class DjSettingChange(models.Model):
+    """Log of settings changes. Raw value is null when setting was deleted from database."""
+    id = models.BigAutoField(primary_key=True)
+
+    name = models.CharField(_("name"),
+                            max_length=255)
+
+    raw_value = models.TextField(_("raw value"),
+                                 null=True,
+                                 blank=True)
+
+    created = models.DateTimeField(_("created"),
+                                   auto_now_add=True,
+                                   db_index=True)
+
+    class Meta:
+        app_label = 'djsettings'
+        verbose_name = _("Django Setting change")
+        verbose_name_plural = _("Django Setting changes")
+
+    def __str__(self):
+        return f"{self.name} setting change"
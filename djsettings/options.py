@@ -1,10 +1,25 @@
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
 from django.utils.text import camel_case_to_spaces
 
+from .caches import validate_cache_options
+from .conf import settings
+from .storages import GroupStorage
+
 
 DEFAULT_NAMES = (
     'verbose_name',
+    'cache_alias',
+    'cache_timeout',
+    'cache_key_prefix',
+    'cache_version',
+    'storage',
+    'storage_name',
 )
 
+STORAGE_SETTING = 'setting'
+STORAGE_GROUP = 'group'
+STORAGES = (STORAGE_SETTING, STORAGE_GROUP)
+
 
 class Options:
     def __init__(self, meta):
@@ -13,6 +28,15 @@ class Options:
         self.object_name = None
         self.verbose_name = None
 
+        self.cache_alias = None
+        self.cache_timeout = DEFAULT_TIMEOUT
+        self.cache_key_prefix = None
+        self.cache_version = None
+
+        self.storage = STORAGE_SETTING
+        self.storage_name = None
+        self.group_storage = None
+
         self.settings = []
 
     def contribute_to_class(self, cls, name):
@@ -39,6 +63,27 @@ class Options:
 
         del self.meta
 
+        if self.cache_alias is None:
+            self.cache_alias = settings.CACHE_ALIAS
+        if self.cache_timeout is DEFAULT_TIMEOUT:
+            self.cache_timeout = settings.CACHE_TIMEOUT
+        if self.cache_key_prefix is None:
+            self.cache_key_prefix = settings.CACHE_KEY_PREFIX
+        if self.cache_version is None:
+            self.cache_version = settings.CACHE_VERSION
+
+        validate_cache_options(self.cache_alias, self.cache_timeout)
+
+        if self.storage not in STORAGES:
+            raise ValueError(f'Invalid storage "{self.storage}", choices are: {STORAGES}')
+
+        if self.storage == STORAGE_GROUP:
+            self.group_storage = GroupStorage(self.storage_name or self.object_name,
+                                              cache_alias=self.cache_alias,
+                                              cache_timeout=self.cache_timeout,
+                                              cache_key_prefix=self.cache_key_prefix,
+                                              cache_version=self.cache_version)
+
     def add_setting(self, field):
         self.settings.append(field)
 
@@ -1,5 +1,24 @@
+import threading
+import weakref
+from importlib import import_module
+from types import MappingProxyType
+
 from .exceptions import SettingAlreadyRegistered, SettingNotRegistered, SettingsGroupClassNotRegistered
+from .asyncs import sync_to_thread
 from .groups import DjSettingsGroup
+from .snapshots import update_scoped_snapshot
+from .values import aget_values, get_values, get_versions, set_values, delete_many_from_cache
+
+
+_registries = weakref.WeakSet()
+
+# Registration in all registries is serialized, as declared settings are bound to the first registry
+_registration_lock = threading.Lock()
+
+
+def get_registered_settings():
+    """Return list of settings registered in all existing registries."""
+    return [setting for registry in list(_registries) for setting in registry.get_settings()]
 
 
 class DjSettingsRegistry:
@@ -7,69 +26,203 @@ class DjSettingsRegistry:
     Settings registry for accessing and editing registered settings.
 
     Settings specified in djsettings.py files are registered automatically
+    in the default ``djsetting`` registry. Other registries are independent
+    of it. Settings of a registry with ``namespace`` are stored in database rows
+    and cache keys prefixed with it, e.g. ``features.new_checkout``, so registries
+    can register the same names and groups without sharing values.
+
+    Registered settings are kept in immutable index by setting names, which is replaced
+    as a whole on ``register`` and ``unregister``, so reads don't take locks.
     """
     __initialized = False
-    
-    __registered_groups = {}
-    __registered_keys = {}
-    __registered_values = {}
 
-    def __init__(self, *args, **kwargs):
+    __manifest = MappingProxyType({})
+
+    def __init__(self, namespace=None):
+        if namespace is not None and (not namespace or ':' in namespace):
+            raise ValueError(f'Invalid registry namespace "{namespace}", it must be non-empty and without colon')
+
+        # Set before any other attribute, __setattr__ looks settings up in the index
+        super().__setattr__('_DjSettingsRegistry__index', MappingProxyType({}))
+        self.__prefix = '' if namespace is None else f'{namespace}.'
+        self.__registered_groups = MappingProxyType({})
         self.__initialized = True
 
+        _registries.add(self)
+
     def register(self, settings_group_cls):
         if not issubclass(settings_group_cls, DjSettingsGroup):
             raise ValueError('Wrapped class must subclass DjSettingsGroup.')
 
         settings_group = settings_group_cls()
 
-        self.__registered_groups[settings_group_cls] = settings_group
+        storage = settings_group_cls._meta.group_storage
+        if storage is not None and self.__prefix:
+            storage = storage.with_prefix(self.__prefix)
 
-        for setting in settings_group._meta.settings:
-            if setting.name in self.__registered_keys:
-                raise SettingAlreadyRegistered(f'Setting "{setting.name}" is already registered')
+        with _registration_lock:
+            registered_groups = dict(self.__registered_groups)
+            index = dict(self.__index)
 
-            self.__registered_keys[setting.name] = settings_group
-            self.__registered_values[setting.name] = setting
+            for setting in settings_group._meta.settings:
+                if setting.name in index:
+                    raise SettingAlreadyRegistered(f'Setting "{setting.name}" is already registered')
 
-    def unregister(self, settings_group_cls):
-        if settings_group_cls not in self.__registered_groups:
-            raise SettingsGroupClassNotRegistered
+            settings = {setting.name: setting.bind(self, self.__prefix, storage)
+                        for setting in settings_group._meta.settings}
+            index.update(settings)
+            settings_group._settings = MappingProxyType(settings)
 
-        for setting in self.__registered_groups[settings_group_cls]._meta.settings:
-            if setting.name in self.__registered_keys:
-                del self.__registered_keys[setting.name]
+            registered_groups[settings_group_cls] = settings_group
 
-            if setting.name in self.__registered_values:
-                del self.__registered_values[setting.name]
+            self.__registered_groups = MappingProxyType(registered_groups)
+            self.__index = MappingProxyType(index)
 
-        del self.__registered_groups[settings_group_cls]
+    def unregister(self, settings_group_cls):
+        with _registration_lock:
+            if settings_group_cls not in self.__registered_groups:
+                raise SettingsGroupClassNotRegistered
+
+            registered_groups = dict(self.__registered_groups)
+            index = dict(self.__index)
+
+            for setting in registered_groups.pop(settings_group_cls)._settings.values():
+                if index.get(setting.name) is setting:
+                    del index[setting.name]
+                    setting.unbind()
+
+            self.__registered_groups = MappingProxyType(registered_groups)
+            self.__index = MappingProxyType(index)
+
+    def set_manifest(self, manifest):
+        """
+        Import modules declaring settings on first access of their settings.
+
+        Manifest is a dict of module names by setting names, see ``djsettings_manifest`` command.
+        """
+        self.__manifest = MappingProxyType(dict(manifest))
+
+    def __find_setting(self, name):
+        """Return registered setting or None, importing module of the setting from manifest if needed."""
+        setting = self.__index.get(name)
+        if setting is None and name in self.__manifest:
+            import_module(self.__manifest[name])
+            setting = self.__index.get(name)
+        return setting
+
+    def __import_manifest_modules(self):
+        manifest = self.__manifest
+        if manifest:
+            for module in dict.fromkeys(manifest.values()):
+                import_module(module)
+            self.__manifest = MappingProxyType({})
 
     def __dir__(self):
-        return self.__registered_keys.keys()
+        self.__import_manifest_modules()
+        return self.__index.keys()
 
     def __getattr__(self, name):
-        if name in self.__registered_keys:
-            return getattr(self.__registered_keys[name], name)
-
-        super().__getattr__(name)
+        setting = self.__find_setting(name)
+        if setting is None:
+            raise AttributeError(f'{self.__class__.__name__} object has no attribute "{name}"')
+        return setting.get()
 
     def __setattr__(self, name, value):
-        if self.__initialized and not hasattr(self, name):
+        setting = self.__find_setting(name)
+        if setting is not None:
+            setting.set(value)
+        elif self.__initialized and not hasattr(self, name):
             raise SettingNotRegistered
         else:
-            if name in self.__registered_keys:
-                setattr(self.__registered_keys[name], name, value)
-            else:
-                super().__setattr__(name, value)
+            super().__setattr__(name, value)
+
+    def get_many(self, names=None):
+        """
+        Return dict of setting values by setting names.
+
+        Values are fetched with one cache request and, for cache misses, one database query.
+        All registered settings are returned when names are not given.
+        """
+        if names is None:
+            settings = self.get_settings()
+        else:
+            settings = [self.get_setting(name) for name in names]
+
+        return get_values(settings)
+
+    async def aget(self, name):
+        """Async version of attribute access, e.g. ``await djsetting.aget('name')``."""
+        values = await self.aget_many([name])
+        return values[name]
+
+    async def aget_many(self, names=None):
+        """
+        Async version of ``get_many``.
+
+        Decoded values served from snapshot or local cache don't leave the event loop,
+        cache and database are accessed and values decoded in a worker thread.
+        """
+        if names is None:
+            settings = self.get_settings()
+        else:
+            settings = [self.get_setting(name) for name in names]
+
+        return await aget_values(settings)
+
+    async def aset(self, name, value):
+        """Async version of attribute assignment, e.g. ``await djsetting.aset('name', value)``."""
+        setting = self.get_setting(name)
+        await sync_to_thread(setattr, self, name, value)
+        update_scoped_snapshot({setting.full_name: setting.to_db(value)})
+
+    def as_dict(self):
+        return self.get_many()
+
+    def set_many(self, values, versions=None):
+        """
+        Save setting values given as dict by setting names, return whether they were saved.
+
+        Values are written with one bulk update, one bulk insert and one cache request.
+        With ``versions`` from ``get_versions``, nothing is saved if any of the settings
+        was changed since versions were read.
+        """
+        return set_values({self.get_setting(name): value for name, value in values.items()}, versions)
+
+    def get_versions(self, names=None):
+        """Return dict of database versions by setting names, 0 for settings not stored."""
+        if names is None:
+            settings = self.get_settings()
+        else:
+            settings = [self.get_setting(name) for name in names]
+
+        return get_versions(settings)
+
+    def compare_and_set(self, name, value, version):
+        """Save setting value only if it still has given version, return whether it was saved."""
+        return self.get_setting(name).set(value, version)
+
+    def invalidate(self, names=None):
+        """Delete cached values of settings, so they are fetched from database on next read."""
+        if names is None:
+            settings = self.get_settings()
+        else:
+            settings = [self.get_setting(name) for name in names]
+
+        delete_many_from_cache(settings)
 
     def get_all_setting_groups(self):
+        self.__import_manifest_modules()
         return self.__registered_groups.values()
 
+    def get_settings(self):
+        self.__import_manifest_modules()
+        return list(self.__index.values())
+
     def get_setting(self, name):
-        if name not in self.__registered_values:
+        setting = self.__find_setting(name)
+        if setting is None:
             raise SettingNotRegistered
-        return self.__registered_values[name]
+        return setting
 
     # used in tests
     def _get_registered_group_classes(self):
@@ -0,0 +1,470 @@
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from types import MappingProxyType
+
+from django.core.cache import caches
+from django.core.signals import request_started, setting_changed
+from django.db import DatabaseError, close_old_connections
+
+from .changes import ChangeLogReplica
+from .conf import settings
+from .files import SharedSnapshot, SnapshotFile
+from .generations import get_generation
+from .storages import expand_stored_values
+
+
+logger = logging.getLogger('djsettings')
+
+_snapshot = None
+_snapshot_lock = threading.Lock()
+
+_scoped_snapshot = ContextVar('djsettings_snapshot', default=None)
+
+
+def get_snapshot(check=True):
+    """
+    Return snapshot of current ``settings_snapshot`` block, process-wide snapshot,
+    shared snapshot file, registry cache copy or None.
+
+    Snapshot is immutable mapping of raw values of all settings stored in database
+    by setting names. Settings missing in snapshot are not stored. Without ``check``
+    shared snapshot file and registry cache are served as they are in memory.
+    """
+    scoped_snapshot = _scoped_snapshot.get()
+    if scoped_snapshot is not None:
+        return scoped_snapshot
+
+    if _snapshot is not None:
+        return _snapshot
+
+    if settings.SHARED_SNAPSHOT_PATH:
+        shared_snapshot = get_shared_snapshot().get(check)
+        if shared_snapshot is not None:
+            return shared_snapshot
+
+    if settings.REGISTRY_CACHE:
+        return get_registry_cache().get(check)
+
+    return None
+
+
+def snapshot_check_due():
+    """Return whether ``get_snapshot`` checks shared snapshot file or registry cache, i.e. does I/O."""
+    if _scoped_snapshot.get() is not None or _snapshot is not None:
+        return False
+
+    if settings.SHARED_SNAPSHOT_PATH:
+        shared_snapshot = get_shared_snapshot()
+        if shared_snapshot.check_due:
+            return True
+        if shared_snapshot.raw_values is not None:
+            return False
+
+    if settings.REGISTRY_CACHE:
+        return get_registry_cache().check_due
+
+    return False
+
+
+def set_snapshot(raw_values):
+    """Replace process-wide snapshot with raw values by setting names, or remove it with None."""
+    global _snapshot
+
+    with _snapshot_lock:
+        _snapshot = None if raw_values is None else MappingProxyType(dict(raw_values))
+
+
+def update_snapshot(raw_values):
+    """Apply raw values changed in this process to process-wide and shared snapshots and snapshot file."""
+    global _snapshot
+
+    with _snapshot_lock:
+        if _snapshot is not None:
+            _snapshot = MappingProxyType({**_snapshot, **raw_values})
+
+    if settings.SHARED_SNAPSHOT_PATH:
+        get_shared_snapshot().update(raw_values)
+
+    if settings.SNAPSHOT_FILE:
+        try:
+            SnapshotFile(settings.SNAPSHOT_FILE).update(raw_values)
+        except (OSError, ValueError):
+            logger.warning('Failed to update settings snapshot file "%s"', settings.SNAPSHOT_FILE, exc_info=True)
+
+
+def update_scoped_snapshot(raw_values):
+    """Apply raw values changed in this process to snapshot of current ``settings_snapshot`` block."""
+    scoped_snapshot = _scoped_snapshot.get()
+    if scoped_snapshot is not None:
+        _scoped_snapshot.set(MappingProxyType({**scoped_snapshot, **raw_values}))
+
+
+@contextmanager
+def settings_snapshot():
+    """
+    Serve settings from one bulk fetch for the duration of the block.
+
+    All registered settings are fetched when the block is entered, so reads inside
+    don't make cache requests and see consistent values. Changes made inside the block
+    are visible in it, changes made elsewhere are not. Nested blocks reuse the outer snapshot.
+    """
+    if _scoped_snapshot.get() is not None:
+        yield
+        return
+
+    from .registries import get_registered_settings
+    from .values import get_raw_values, not_stored
+
+    raw_values = get_raw_values(get_registered_settings())
+    snapshot = {name: raw_value for name, raw_value in raw_values.items() if raw_value is not not_stored}
+
+    token = _scoped_snapshot.set(MappingProxyType(snapshot))
+    try:
+        yield
+    finally:
+        _scoped_snapshot.reset(token)
+
+
+class RegistryCache:
+    """
+    In-process copy of raw values of all stored settings, shared through Django cache as one blob.
+
+    Blob is tagged with settings generation it was built at. The copy is validated
+    with one generation request per Django request or every ``DJSETTINGS_REGISTRY_CACHE_TIMEOUT``
+    seconds, the blob is fetched only when generation changed and rebuilt from one query
+    when it is missing or older than current generation.
+    """
+
+    def __init__(self, timeout):
+        self.timeout = timeout
+        self.generation = None
+        self.raw_values = None
+
+        self._checked_at = None
+        self._lock = threading.Lock()
+
+    @property
+    def cache(self):
+        return caches[settings.CACHE_ALIAS]
+
+    @staticmethod
+    def _get_cache_key():
+        return f'{settings.CACHE_KEY_PREFIX}:registry'
+
+    def get(self, check=True):
+        """Return copy of raw values, validating it first if it is missing or expired, unless ``check`` is False."""
+        if check and self.check_due:
+            self.validate()
+        return self.raw_values
+
+    @property
+    def check_due(self):
+        """Whether the copy is validated on next ``get``."""
+        checked_at = self._checked_at
+        return checked_at is None or (self.timeout is not None and time.monotonic() - checked_at >= self.timeout)
+
+    def validate(self):
+        """Replace the copy if settings generation changed since it was built."""
+        with self._lock:
+            generation = get_generation()
+
+            if generation != self.generation:
+                blob = self.cache.get(self._get_cache_key(), version=settings.CACHE_VERSION)
+                if blob is not None and blob[0] == generation:
+                    self._set(*blob)
+                else:
+                    self._rebuild(generation)
+
+            self._checked_at = time.monotonic()
+
+    def rebuild(self, generation):
+        """Build blob of given generation from database and publish it to Django cache."""
+        with self._lock:
+            self._rebuild(generation)
+            self._checked_at = time.monotonic()
+
+    def _rebuild(self, generation):
+        from .models import DjSetting
+
+        # Generation is read before the query, so content is never older than its tag
+        raw_values = expand_stored_values(dict(DjSetting.objects.values_list('name', 'raw_value')))
+        self.cache.set(self._get_cache_key(), (generation, raw_values), None, version=settings.CACHE_VERSION)
+        self._set(generation, raw_values)
+
+    def _set(self, generation, raw_values):
+        self.generation = generation
+        self.raw_values = MappingProxyType(raw_values)
+
+    def __repr__(self):
+        return f'<{self.__class__.__name__} object>'
+
+
+_registry_cache = None
+
+
+def get_registry_cache():
+    """Return process copy of registry cache, see ``RegistryCache``."""
+    global _registry_cache
+
+    if _registry_cache is None:
+        _registry_cache = RegistryCache(settings.REGISTRY_CACHE_TIMEOUT)
+
+    return _registry_cache
+
+
+def rebuild_registry_cache(generation):
+    """Rebuild registry cache after settings change, if it is enabled."""
+    if settings.REGISTRY_CACHE:
+        get_registry_cache().rebuild(generation)
+
+
+def validate_registry_cache(**kwargs):
+    if settings.REGISTRY_CACHE:
+        get_registry_cache().validate()
+
+
+_shared_snapshot = None
+
+
+def get_shared_snapshot():
+    """Return reader of snapshot file published by ``djsettings_publish_snapshot`` command."""
+    global _shared_snapshot
+
+    if _shared_snapshot is None:
+        _shared_snapshot = SharedSnapshot(settings.SHARED_SNAPSHOT_PATH, settings.SHARED_SNAPSHOT_CHECK_INTERVAL,
+                                          settings.SHARED_SNAPSHOT_MAX_AGE)
+
+    return _shared_snapshot
+
+
+def write_snapshot_file(path):
+    """Write raw values of all stored settings to snapshot file with two queries, return them."""
+    replica = ChangeLogReplica()
+    replica.refresh()
+    SnapshotFile(path).write(replica.last_change_id, replica.raw_values)
+    return replica.raw_values
+
+
+def load_snapshot_file(path):
+    """
+    Serve settings from snapshot file until database is reached, return whether the file was loaded.
+
+    Loaded values become the process-wide snapshot, so the process doesn't wait for database or cache
+    on startup. Unless background refresh replaces it, it is removed by ``SnapshotFileReconciler``
+    once database is reached.
+    """
+    try:
+        snapshot = SnapshotFile(path).read()
+    except ValueError:
+        logger.warning('Invalid settings snapshot file "%s", ignoring it', path, exc_info=True)
+        return False
+
+    if snapshot is None:
+        return False
+
+    set_snapshot(snapshot[1])
+    return True
+
+
+_fallback_snapshot = None
+
+
+def get_fallback_snapshot():
+    """Return raw values from ``DJSETTINGS_SNAPSHOT_FILE`` to serve while database is unreachable, or None."""
+    global _fallback_snapshot
+
+    if not settings.SNAPSHOT_FILE:
+        return None
+
+    if _fallback_snapshot is None:
+        _fallback_snapshot = SharedSnapshot(settings.SNAPSHOT_FILE, settings.SHARED_SNAPSHOT_CHECK_INTERVAL)
+
+    return _fallback_snapshot.get()
+
+
+def _reset_snapshots(setting, **kwargs):
+    global _registry_cache, _shared_snapshot, _fallback_snapshot
+
+    if setting.startswith('DJSETTINGS_'):
+        _registry_cache = None
+        _shared_snapshot = None
+        _fallback_snapshot = None
+
+
+request_started.connect(validate_registry_cache, dispatch_uid='djsettings.snapshots.validate_registry_cache')
+setting_changed.connect(_reset_snapshots, dispatch_uid='djsettings.snapshots._reset_snapshots')
+
+
+class SnapshotRefresher:
+    """
+    Background thread refreshing process-wide snapshot every ``interval`` seconds.
+
+    Snapshot is refreshed from change log, so each refresh is one small query,
+    and replaced as a whole, so readers never see partially applied changes.
+    """
+
+    def __init__(self, interval):
+        self.interval = interval
+        self.replica = ChangeLogReplica()
+
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self.run, name='djsettings-refresher', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def refresh(self):
+        if self.replica.refresh():
+            set_snapshot(self.replica.raw_values)
+
+    def run(self):
+        """Refresh snapshot every ``interval`` seconds until stopped."""
+        while not self._stopped.is_set():
+            try:
+                self.refresh()
+            except Exception:
+                logger.exception('Failed to refresh djsettings snapshot, keeping the previous one')
+            finally:
+                close_old_connections()
+
+            self._stopped.wait(self.interval)
+
+    def __repr__(self):
+        return f'<{self.__class__.__name__} object>'
+
+
+class SharedSnapshotPublisher(SnapshotRefresher):
+    """
+    Refresher publishing snapshot to a file read by all processes on the host.
+
+    Snapshot is tagged with id of the last applied change, so a file written
+    by a concurrent publisher with newer changes is not replaced. File is touched
+    on refreshes without changes, so readers can tell that it is up to date.
+    """
+
+    def __init__(self, path, interval):
+        super().__init__(interval)
+        self.file = SnapshotFile(path)
+
+        self._published = False
+
+    def refresh(self):
+        if self.replica.refresh() or not self._published:
+            # The first snapshot replaces file left by previous publisher, change ids may be reset since then
+            self.file.publish(self.replica.last_change_id, self.replica.raw_values, force=not self._published)
+            self._published = True
+        else:
+            self.file.touch()
+
+
+class SnapshotFileReconciler(SnapshotRefresher):
+    """
+    Background thread replacing snapshot loaded from file on startup with database state.
+
+    Database is retried every ``interval`` seconds. Once it is reached, the file is rewritten
+    with current values, process-wide snapshot is removed and the thread stops.
+    """
+
+    def __init__(self, path, interval):
+        super().__init__(interval)
+        self.file = SnapshotFile(path)
+
+    def refresh(self):
+        try:
+            self.replica.refresh()
+        except DatabaseError as e:
+            logger.warning('Database is unreachable, serving settings from snapshot file: %s', e)
+            return
+
+        try:
+            self.file.write(self.replica.last_change_id, self.replica.raw_values)
+        except OSError:
+            logger.warning('Failed to write settings snapshot file "%s"', self.file.path, exc_info=True)
+
+        set_snapshot(None)
+        self._stopped.set()
+
+    @property
+    def stopped(self):
+        return self._stopped.is_set()
+
+
+_reconciler = None
+
+
+def start_reconciler(path, interval):
+    """Start background reconciler of snapshot loaded from file, if it is not running yet."""
+    global _reconciler
+
+    if _reconciler is None or _reconciler.stopped:
+        _reconciler = SnapshotFileReconciler(path, interval)
+        _reconciler.start()
+
+    return _reconciler
+
+
+def stop_reconciler():
+    global _reconciler
+
+    if _reconciler is not None:
+        _reconciler.stop()
+        _reconciler = None
+
+
+_refresher = None
+
+
+def start_refresher(interval):
+    """Start background refresher of process-wide snapshot, if it is not started yet."""
+    global _refresher
+
+    if _refresher is None:
+        _refresher = SnapshotRefresher(interval)
+        _refresher.start()
+
+    return _refresher
+
+
+def stop_refresher():
+    global _refresher
+
+    if _refresher is not None:
+        _refresher.stop()
+        _refresher = None
+
+
+def _after_fork_in_child():
+    global _refresher, _reconciler, _snapshot_lock
+
+    # Threads don't survive fork and locks may be left acquired by them
+    _snapshot_lock = threading.Lock()
+    if _registry_cache is not None:
+        _registry_cache._lock = threading.Lock()
+    for shared_snapshot in (_shared_snapshot, _fallback_snapshot):
+        if shared_snapshot is not None:
+            shared_snapshot._lock = threading.Lock()
+
+    if _refresher is not None:
+        interval = _refresher.interval
+        _refresher = None
+        start_refresher(interval)
+
+    # Snapshot loaded from file is inherited, so it has to be reconciled in the child too
+    if _reconciler is not None and not _reconciler.stopped:
+        path, interval = _reconciler.file.path, _reconciler.interval
+        _reconciler = None
+        start_reconciler(path, interval)
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
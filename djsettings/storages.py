@@ -0,0 +1,66 @@
+import copy
+import json
+
+
+GROUP_PREFIX = 'group:'
+
+
+class GroupStorage:
+    """
+    Storage of all settings of a group in one database row and one cache key.
+
+    Raw values of the settings are stored as JSON object by setting names,
+    settings missing in it are not stored.
+    """
+    __slots__ = ('name', 'cache_alias', 'cache_timeout', 'cache_key_prefix', 'cache_version', '_decoded')
+
+    def __init__(self, name, *, cache_alias, cache_timeout, cache_key_prefix, cache_version):
+        self.name = f'{GROUP_PREFIX}{name}'
+        self.cache_alias = cache_alias
+        self.cache_timeout = cache_timeout
+        self.cache_key_prefix = cache_key_prefix
+        self.cache_version = cache_version
+
+        self._decoded = None
+
+    def decode(self, stored_value):
+        """Return dict of raw values by setting names, parsing stored value only once per change."""
+        decoded = self._decoded
+        if decoded is not None and decoded[0] == stored_value:
+            return decoded[1]
+
+        raw_values = json.loads(stored_value) if stored_value else {}
+        self._decoded = (stored_value, raw_values)
+        return raw_values
+
+    @staticmethod
+    def encode(raw_values):
+        return json.dumps(raw_values, sort_keys=True)
+
+    def with_prefix(self, prefix):
+        """Return copy of the storage with row name prefixed with registry namespace."""
+        storage = copy.copy(self)
+        storage.name = f'{prefix}{self.name}'
+        storage._decoded = None
+        return storage
+
+    def __repr__(self):
+        return f'<{self.__class__.__name__} object>'
+
+
+def expand_stored_values(stored_values):
+    """
+    Return dict of raw values by full setting names from values stored in database rows by row names.
+
+    Names of settings stored in group get namespace prefix of the group row.
+    """
+    raw_values = {}
+    for name, stored_value in stored_values.items():
+        prefix, group_prefix, _ = name.partition(GROUP_PREFIX)
+        if group_prefix:
+            group_raw_values = json.loads(stored_value) if stored_value else {}
+            raw_values.update({f'{prefix}{setting_name}': raw_value
+                               for setting_name, raw_value in group_raw_values.items()})
+        else:
+            raw_values[name] = stored_value
+    return raw_values
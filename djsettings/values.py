@@ -1,11 +1,26 @@
-from django.core.cache import cache
+import copy
+import logging
+import time
+import weakref
+from collections import defaultdict
+
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
 from django import forms
 from django.core.exceptions import ValidationError
 from django.forms import widgets
-from django.utils.functional import cached_property
+from django.utils.functional import empty as lazy_empty, SimpleLazyObject
 from django.utils.encoding import force_text
-from django.db.models import signals
-
+from django.db import DatabaseError, IntegrityError, router, transaction
+from django.db.models import F, signals
+
+from .asyncs import sync_to_thread
+from .caches import get_local_cache, validate_cache_options, SingleFlight
+from .conf import settings as djsettings_settings
+from .changes import record_changes
+from .generations import bump_generation
+from .snapshots import get_fallback_snapshot, get_snapshot, snapshot_check_due, update_scoped_snapshot, \
+    update_snapshot
 from .exceptions import InvalidSettingValue, SettingCachedValueNotFound, InvalidDefaultSettingValue, \
     DefaultSettingValueRequired
 
@@ -14,7 +29,18 @@ class empty:
     pass
 
 
+class not_stored:
+    """Cached in place of raw value of a setting which is not stored in database."""
+
+
+logger = logging.getLogger('djsettings')
+
+single_flight = SingleFlight()
+
+
 class ValueDescriptor:
+    __slots__ = ('value',)
+
     def __init__(self, value):
         self.value = value
 
@@ -22,90 +48,652 @@ class ValueDescriptor:
         if instance is None:
             raise AttributeError(f"{self.value.name} is only accessible from {owner.__name__} instances.")
 
+        return self._get_setting(instance).get()
+
+    def __set__(self, instance, value):
+        self._get_setting(instance).set(value)
+
+    def _get_setting(self, instance):
+        # Group instances created by registries hold settings bound to them
+        return instance._settings.get(self.value.name, self.value)
+
+
+def get_raw_values(settings):
+    """
+    Return dict of raw values of given settings by full setting names.
+
+    Values are looked up in local cache, then in Django cache with one request
+    and then in database with one query. Found values are saved to the caches
+    they were missing in. Settings without database row get ``not_stored``.
+    Settings stored in group are fetched with one cache key and row per group.
+
+    When snapshot is available, values are taken from it. When database is unreachable,
+    values missing in caches are taken from ``DJSETTINGS_SNAPSHOT_FILE``.
+    """
+    raw_values, missing = _get_local_raw_values(settings)
+    raw_values.update(_get_shared_raw_values(missing))
+    return raw_values
+
+
+def _get_shared_raw_values(settings):
+    """Return raw values of given settings from Django cache or database, skipping snapshots and local cache."""
+    raw_values = {}
+    local_cache = get_local_cache()
+
+    for (cache_alias, cache_version), cache_keys in _group_by_cache(settings).items():
+        for cache_key, cached_value in caches[cache_alias].get_many(cache_keys, version=cache_version).items():
+            for setting in cache_keys[cache_key]:
+                raw_values[setting.full_name] = setting._extract(cached_value)
+
+            if local_cache is not None:
+                local_cache.set(cache_key, cached_value)
+
+    missing = [setting for setting in settings if setting.full_name not in raw_values]
+
+    if missing:
+        from .models import DjSetting
+        stored_values = dict.fromkeys([setting.storage_name for setting in missing], not_stored)
         try:
-            return self.value.get_from_cache(self.value.name)
-        except SettingCachedValueNotFound:
-            pass
+            stored_values.update(DjSetting.objects.filter(name__in=stored_values.keys())
+                                 .values_list('name', 'raw_value'))
+        except DatabaseError as e:
+            raw_values.update(_get_fallback_raw_values(missing, e))
+            return raw_values
+        save_many_to_cache(missing, stored_values)
 
-        db_setting = self.value.save_to_db(name=self.value.name, value=self.value.default)
-        self.value.save_to_cache(db_setting)
-        return self.value.to_python(db_setting.raw_value)
+        for setting in missing:
+            raw_values[setting.full_name] = setting._extract(stored_values[setting.storage_name])
 
-    def __set__(self, instance, value):
-        current_value = self.__get__(instance)
+    return raw_values
+
+
+def _get_fallback_raw_values(settings, error):
+    """Return raw values of given settings from snapshot file or raise database error if there is no file."""
+    snapshot = get_fallback_snapshot()
+    if snapshot is None:
+        raise error
+
+    logger.warning('Database is unreachable, reading settings from snapshot file: %s', error)
+    return {setting.full_name: snapshot.get(setting.full_name, not_stored) for setting in settings}
+
+
+def _get_local_raw_values(settings, check=True):
+    """
+    Return raw values found in snapshot or local cache and list of settings missing there.
+
+    Without ``check`` snapshot is served as it is in memory, see ``get_snapshot``.
+    """
+    snapshot = get_snapshot(check)
+    if snapshot is not None:
+        return {setting.full_name: snapshot.get(setting.full_name, not_stored) for setting in settings}, []
 
-        self.value.validate(value)
+    raw_values = {}
+    missing = []
+    local_cache = get_local_cache()
 
-        if value != current_value:
-            db_setting = self.value.update_db(name=self.value.name, value=value)
-            self.value.save_to_cache(db_setting)
+    for setting in settings:
+        if local_cache is not None:
+            cached_value = local_cache.get(setting.cache_key, SettingCachedValueNotFound)
+            if cached_value is not SettingCachedValueNotFound:
+                raw_values[setting.full_name] = setting._extract(cached_value)
+                continue
+
+        missing.append(setting)
+
+    return raw_values, missing
+
+
+def get_values(settings):
+    """
+    Return dict of python values of given settings.
+
+    Settings missing in database get default values.
+    """
+    raw_values = get_raw_values(settings)
+    return {setting.name: setting.from_raw(raw_values[setting.full_name]) for setting in settings}
+
+
+async def aget_values(settings):
+    """
+    Async version of ``get_values``.
+
+    Values found in snapshot or local cache and already decoded are returned without leaving
+    the event loop, otherwise all values are fetched and decoded with ``get_values`` in a worker
+    thread, as decoding may query the database. Snapshot which has to be checked first,
+    i.e. shared snapshot file or registry cache, is also checked in the worker thread.
+    """
+    if snapshot_check_due():
+        return await sync_to_thread(get_values, settings)
+
+    raw_values, missing = _get_local_raw_values(settings, check=False)
+    if missing or not all(setting._is_decoded(raw_values[setting.full_name]) for setting in settings):
+        return await sync_to_thread(get_values, settings)
+
+    return {setting.name: setting.from_raw(raw_values[setting.full_name]) for setting in settings}
+
+
+def get_versions(settings):
+    """
+    Return dict of database versions of given settings, 0 for settings not stored.
+
+    Settings stored in group share version of the group.
+    """
+    from .models import DjSetting
+    versions = dict.fromkeys([setting.storage_name for setting in settings], 0)
+    versions.update(DjSetting.objects.filter(name__in=versions.keys()).values_list('name', 'version'))
+    return {setting.name: versions[setting.storage_name] for setting in settings}
+
+
+def set_values(setting_values, versions=None):
+    """
+    Validate and save python values of given settings, return whether they were saved.
+
+    Values are written with one bulk update and one bulk insert
+    and published with one cache request once transaction is committed.
+    Settings stored in group are written with one update of the group row.
+
+    With ``versions`` dict by setting names, stored rows are locked and nothing
+    is saved if any of the settings doesn't have given version anymore.
+    """
+    from .models import DjSetting
+
+    raw_values = {}
+    row_raw_values = {}
+    group_raw_values = defaultdict(dict)
+    for setting, value in setting_values.items():
+        setting.validate(value)
+        raw_value = setting.to_db(value)
+        raw_values[setting.full_name] = raw_value
+        if setting.storage is None:
+            row_raw_values[setting.storage_name] = raw_value
+        else:
+            group_raw_values[setting.storage][setting.name] = raw_value
+
+    if not raw_values:
+        return True
+
+    if versions is not None:
+        # Versions are given by setting names, rows are checked by row names
+        versions = {setting.storage_name: versions[setting.name]
+                    for setting in setting_values if setting.name in versions}
+
+    stored_values = dict(row_raw_values)
+
+    try:
+        with transaction.atomic(using=router.db_for_write(DjSetting)):
+            if not _write_raw_values(row_raw_values, versions):
+                return False
+
+            for storage, storage_raw_values in group_raw_values.items():
+                version = None if versions is None else versions.get(storage.name)
+                stored_value = _write_group_raw_values(storage, storage_raw_values, version)
+                if stored_value is None:
+                    transaction.set_rollback(True)
+                    return False
+
+                stored_values[storage.name] = stored_value
+
+            record_changes(raw_values)
+            _publish_on_commit(setting_values.keys(), stored_values, raw_values)
+            bump_generation()
+    except IntegrityError:
+        if versions is None:
+            raise
+        # Setting was stored concurrently since versions were read
+        return False
+
+    return True
+
+
+def _write_raw_values(raw_values, versions=None):
+    """
+    Write raw values of settings by row names to database in current transaction, return whether they were written.
+
+    Values are written with one bulk update and one bulk insert. With ``versions`` stored rows
+    are locked and nothing is written if any of them doesn't have given version anymore,
+    version 0 means that setting must not be stored yet.
+    """
+    from .models import DjSetting
+
+    queryset = DjSetting.objects.filter(name__in=raw_values.keys())
+    if versions is not None:
+        queryset = queryset.select_for_update()
+    db_objs = list(queryset)
+
+    if versions is not None:
+        stored_versions = {db_obj.name: db_obj.version for db_obj in db_objs}
+        for name in raw_values:
+            version = versions.get(name)
+            if version is not None and version != stored_versions.get(name, 0):
+                return False
+
+    for db_obj in db_objs:
+        db_obj.raw_value = raw_values[db_obj.name]
+        db_obj.version = F('version') + 1
+    DjSetting.objects.bulk_update(db_objs, ['raw_value', 'version'])
+
+    existing_names = {db_obj.name for db_obj in db_objs}
+    DjSetting.objects.bulk_create([DjSetting(name=name, raw_value=raw_value)
+                                   for name, raw_value in raw_values.items() if name not in existing_names])
+    return True
+
+
+def _publish_on_commit(settings, stored_values, raw_values):
+    """
+    Save values written in current transaction to caches and snapshots once it is committed.
+
+    Snapshot of current ``settings_snapshot`` block is updated immediately,
+    as the transaction sees its own changes.
+    """
+    from .models import DjSetting
+
+    def publish():
+        save_many_to_cache(settings, stored_values)
+        update_snapshot(raw_values)
+
+    update_scoped_snapshot(raw_values)
+    transaction.on_commit(publish, using=router.db_for_write(DjSetting))
+
+
+def _write_raw_value(name, raw_value, version=None):
+    """
+    Write raw value of setting to database in current transaction, return whether it was written.
+
+    Stored setting is changed with one UPDATE. With ``version`` it is only changed if it still
+    has that version, version 0 means that setting must not be stored yet.
+    """
+    from .models import DjSetting
+
+    if version != 0:
+        queryset = DjSetting.objects.filter(name=name)
+        if version is not None:
+            queryset = queryset.filter(version=version)
+
+        if queryset.update(raw_value=raw_value, version=F('version') + 1):
+            return True
+
+        if version is not None:
+            return False
+
+    try:
+        with transaction.atomic(using=router.db_for_write(DjSetting)):
+            DjSetting.objects.create(name=name, raw_value=raw_value)
+    except IntegrityError:
+        if version == 0:
+            return False
+        # Setting was stored concurrently, overwrite it
+        DjSetting.objects.filter(name=name).update(raw_value=raw_value, version=F('version') + 1)
+
+    return True
+
+
+def _write_group_raw_values(storage, raw_values, version=None, overwrite=True):
+    """
+    Merge raw values into group row in current transaction, return new stored value or None if not written.
+
+    Group row is locked while it is changed. With ``version`` it is only changed if it still
+    has that version, version 0 means that group must not be stored yet. Without ``overwrite``
+    only settings which are not stored in the group yet are written.
+    """
+    from .models import DjSetting
+
+    db_obj = DjSetting.objects.select_for_update().filter(name=storage.name).first()
+
+    if db_obj is None:
+        if version not in (None, 0):
+            return None
+
+        stored_value = storage.encode(raw_values)
+        try:
+            with transaction.atomic(using=router.db_for_write(DjSetting)):
+                DjSetting.objects.create(name=storage.name, raw_value=stored_value)
+        except IntegrityError:
+            if version == 0:
+                return None
+            # Group was stored concurrently, merge into it
+            return _write_group_raw_values(storage, raw_values, overwrite=overwrite)
+        return stored_value
+
+    if version is not None and db_obj.version != version:
+        return None
+
+    stored_raw_values = storage.decode(db_obj.raw_value)
+    if overwrite:
+        stored_value = storage.encode({**stored_raw_values, **raw_values})
+    else:
+        stored_value = storage.encode({**raw_values, **stored_raw_values})
+    DjSetting.objects.filter(pk=db_obj.pk).update(raw_value=stored_value, version=F('version') + 1)
+    return stored_value
+
+
+def save_many_to_cache(settings, stored_values):
+    """
+    Save values of given settings to Django cache with one request per cache.
+
+    Values are given by names of database rows, i.e. raw values by full setting names
+    and values of settings stored in group by group row names.
+    """
+    settings = [setting for setting in settings if setting.storage_name in stored_values]
+    local_cache = get_local_cache()
+
+    for (cache_alias, cache_version, cache_timeout), cache_keys in _group_by_cache(settings, timeout=True).items():
+        cached_values = {cache_key: stored_values[key_settings[0].storage_name]
+                         for cache_key, key_settings in cache_keys.items()}
+        caches[cache_alias].set_many(cached_values, cache_timeout, version=cache_version)
+
+        if local_cache is not None:
+            for cache_key, cached_value in cached_values.items():
+                local_cache.set(cache_key, cached_value)
+
+
+def delete_many_from_cache(settings):
+    """Delete cached values of given settings with one request per cache."""
+    local_cache = get_local_cache()
+
+    for (cache_alias, cache_version), cache_keys in _group_by_cache(settings).items():
+        caches[cache_alias].delete_many(cache_keys, version=cache_version)
+
+        if local_cache is not None:
+            for cache_key in cache_keys:
+                local_cache.delete(cache_key)
+
+
+def _group_by_cache(settings, timeout=False):
+    """
+    Group settings by cache alias and version (and timeout) into dicts of settings lists by cache keys.
+
+    Settings stored in group share one cache key.
+    """
+    groups = defaultdict(lambda: defaultdict(list))
+    for setting in settings:
+        group_key = (setting.cache_alias, setting.cache_version)
+        if timeout:
+            group_key += (setting.cache_timeout,)
+        groups[group_key][setting.cache_key].append(setting)
+    return groups
 
 
 class BaseValueType:
+    """
+    Base class of setting value types.
+
+    Value types use ``__slots__`` and don't keep form fields, which are built
+    when needed, to keep memory used by thousands of settings low. Subclasses
+    must declare ``__slots__`` for their attributes.
+
+    Value declared in a group is used by the first registry without namespace registering
+    the group, other registries use its copies, see ``DjSettingsRegistry``.
+    """
+    __slots__ = ('name', 'full_name', 'group', '_registry', 'cache_alias', 'cache_timeout', 'cache_key_prefix',
+                 'cache_version', 'cache_decoded_value', '_required', '_widget', '_verbose_name', '_help_text',
+                 '_validators', '_default', '_default_validated', '_decoded', '_decoded_default', 'storage',
+                 '__weakref__')
+
     form_field_class = None
     descriptor_class = ValueDescriptor
 
-    def __init__(self, *, default=empty, required=True, widget=None, verbose_name=None, help_text='', validators=()):
+    _empty_values = (None, '', [], (), {})
+
+    def __init__(self, *, default=empty, required=True, widget=None, verbose_name=None, help_text='', validators=(),
+                 cache_alias=None, cache_timeout=DEFAULT_TIMEOUT, cache_key_prefix=None, cache_version=None):
 
         self.name = None
+        self.full_name = None
         self.group = None
+        self._registry = None
+        self.storage = None
+
+        validate_cache_options(cache_alias, cache_timeout)
+
+        self.cache_alias = cache_alias
+        self.cache_timeout = cache_timeout
+        self.cache_key_prefix = cache_key_prefix
+        self.cache_version = cache_version
 
         self._required = required
         self._widget = widget
         self._verbose_name = verbose_name
         self._help_text = help_text
         self._validators = validators
-        self._empty_values = (None, '', [], (), {})
+        self._decoded = None
+        self.cache_decoded_value = True
 
         if default is empty:
             raise DefaultSettingValueRequired
 
-        try:
-            self.validate(default)
-        except InvalidSettingValue as e:
-            raise InvalidDefaultSettingValue(e)
-
         self._default = default
+        self._default_validated = False
+        self._decoded_default = None
+
+        if not djsettings_settings.LAZY_VALIDATION:
+            self.validate_default()
 
     def contribute_to_class(self, cls, name):
         self.name = self.name or name
+        self.full_name = self.name
         self.group = cls
+        self.storage = cls._meta.group_storage
+
+        if self.storage is not None and (self.cache_alias is not None or self.cache_timeout is not DEFAULT_TIMEOUT
+                                         or self.cache_key_prefix is not None or self.cache_version is not None):
+            raise ValueError(f'Cache options of setting "{self.name}" stored in group must be set in group Meta')
+
+        # Cache options not given to the value are taken from the group
+        if self.cache_alias is None:
+            self.cache_alias = cls._meta.cache_alias
+        if self.cache_timeout is DEFAULT_TIMEOUT:
+            self.cache_timeout = cls._meta.cache_timeout
+        if self.cache_key_prefix is None:
+            self.cache_key_prefix = cls._meta.cache_key_prefix
+        if self.cache_version is None:
+            self.cache_version = cls._meta.cache_version
+
         cls._meta.add_setting(self)
         setattr(cls, self.name, self.descriptor_class(self))
 
+    @property
+    def registry(self):
+        """Registry the setting is registered in or None."""
+        return None if self._registry is None else self._registry()
+
+    def bind(self, registry, prefix='', storage=None):
+        """
+        Return the setting registered in given registry.
+
+        The setting itself is returned, unless it is registered elsewhere or registry has namespace ``prefix``,
+        then it is copied with name and group ``storage`` prefixed, so registries don't share values.
+        """
+        if prefix or self.registry is not None:
+            setting = copy.copy(self)
+            setting.full_name = f'{prefix}{self.name}'
+            setting.storage = storage
+            setting._decoded = None
+            setting._decoded_default = None
+        else:
+            setting = self
+
+        # Weak reference, so registries which are not used anymore are freed without gc
+        setting._registry = weakref.ref(registry)
+        return setting
+
+    def unbind(self):
+        self._registry = None
+
+    @property
+    def cache(self):
+        return caches[self.cache_alias]
+
     def _get_cache_key(self, name):
-        return f'djsettings_{name}'
+        return f'{self.cache_key_prefix}{name}'
+
+    @property
+    def storage_name(self):
+        """Name of database row the value is stored in, also used in cache key."""
+        return self.full_name if self.storage is None else self.storage.name
+
+    @property
+    def cache_key(self):
+        return self._get_cache_key(self.storage_name)
+
+    @property
+    def lock_key(self):
+        """Cache key of miss lock, separated from keys of values, as setting names can't contain colon."""
+        return f'{self.cache_key_prefix}:lock:{self.storage_name}'
+
+    def _extract(self, stored_value):
+        """Return raw value of the setting from value stored in its database row."""
+        if self.storage is None or stored_value is not_stored:
+            return stored_value
+        return self.storage.decode(stored_value).get(self.name, not_stored)
+
+    def get(self):
+        """Return value from snapshot, caches or database, or from snapshot file if database is unreachable."""
+        snapshot = get_snapshot()
+        if snapshot is not None:
+            return self.from_raw(snapshot.get(self.full_name, not_stored))
+
+        try:
+            return self.get_from_cache(self.storage_name)
+        except SettingCachedValueNotFound:
+            pass
+
+        try:
+            stored_value = self.load()
+        except DatabaseError as e:
+            return self.from_raw(_get_fallback_raw_values([self], e)[self.full_name])
+
+        return self.from_raw(self._extract(stored_value))
 
     def get_from_cache(self, name):
-        cached_value = cache.get(self._get_cache_key(name), SettingCachedValueNotFound)
+        cache_key = self._get_cache_key(name) if self.storage is None else self.cache_key
+        local_cache = get_local_cache()
+
+        if local_cache is not None:
+            cached_value = local_cache.get(cache_key, SettingCachedValueNotFound)
+            if cached_value is not SettingCachedValueNotFound:
+                return self.from_raw(self._extract(cached_value))
+
+        cached_value = self.cache.get(cache_key, SettingCachedValueNotFound, version=self.cache_version)
         if cached_value is SettingCachedValueNotFound:
             raise SettingCachedValueNotFound
 
-        return self.to_python(cached_value)
+        if local_cache is not None:
+            local_cache.set(cache_key, cached_value)
+
+        return self.from_raw(self._extract(cached_value))
+
+    def load(self):
+        """
+        Load value stored in database row of the setting and save it to cache.
+
+        Concurrent cache misses in the process wait for one load. With ``DJSETTINGS_MISS_LOCK``
+        enabled, processes also coordinate with a short living cache lock, so only one of them
+        hits the database while others wait for the cache to be refilled.
+        """
+        return single_flight.do(self.cache_key, self._load)
+
+    def _load(self):
+        cache = self.cache
+        cache_key = self.cache_key
+        lock_key = self.lock_key
+        locked = False
+
+        if djsettings_settings.MISS_LOCK:
+            timeout = djsettings_settings.MISS_LOCK_TIMEOUT
+            locked = cache.add(lock_key, True, timeout, version=self.cache_version)
+
+            if not locked:
+                deadline = time.monotonic() + timeout
+                while time.monotonic() < deadline:
+                    time.sleep(djsettings_settings.MISS_LOCK_WAIT_INTERVAL)
+                    cached_value = cache.get(cache_key, SettingCachedValueNotFound, version=self.cache_version)
+                    if cached_value is not SettingCachedValueNotFound:
+                        return cached_value
+                # Lock holder has not refilled the cache in time, load value ourselves
+
+        try:
+            stored_value = self.get_from_db(self.storage_name)
+            self.save_raw_to_cache(self.storage_name, stored_value)
+        finally:
+            if locked:
+                cache.delete(lock_key, version=self.cache_version)
+
+        return stored_value
 
     def save_to_cache(self, db_obj):
-        cache.set(self._get_cache_key(db_obj.name), db_obj.raw_value)
+        self.save_raw_to_cache(db_obj.name, db_obj.raw_value)
+
+    def save_raw_to_cache(self, name, raw_value):
+        cache_key = self._get_cache_key(name)
+        self.cache.set(cache_key, raw_value, self.cache_timeout, version=self.cache_version)
 
-    def save_to_db(self, name, value):
+        local_cache = get_local_cache()
+        if local_cache is not None:
+            local_cache.set(cache_key, raw_value)
+
+    def get_from_db(self, name):
+        """Return raw value stored in database or ``not_stored``. Missing row is not created."""
         from .models import DjSetting
-        db_obj, created = DjSetting.objects.get_or_create(
-            name=name,
-            defaults={'raw_value': self.to_db(value)}
-        )
-        return db_obj
+        raw_value = DjSetting.objects.filter(name=name).values_list('raw_value', flat=True).first()
+        return not_stored if raw_value is None else raw_value
 
-    def update_db(self, name, value):
+    def update_db(self, name, raw_value, version=None):
+        """Write raw value to database, return False if setting doesn't have given version anymore."""
         from .models import DjSetting
-        db_obj, created = DjSetting.objects.update_or_create(
-            name=name,
-            defaults={'raw_value': self.to_db(value)}
-        )
-        return db_obj
 
-    @cached_property
+        with transaction.atomic(using=router.db_for_write(DjSetting), savepoint=False):
+            if not _write_raw_value(name, raw_value, version):
+                return False
+            record_changes({name: raw_value})
+
+        return True
+
+    def set(self, value, version=None):
+        """
+        Validate and save value without reading the current one, return whether it was saved.
+
+        With ``version`` value is only saved if setting still has that version, see ``get_versions``.
+        """
+        from .models import DjSetting
+
+        self.validate(value)
+        raw_value = self.to_db(value)
+
+        with transaction.atomic(using=router.db_for_write(DjSetting)):
+            if self.storage is None:
+                if not self.update_db(self.storage_name, raw_value, version):
+                    return False
+                stored_value = raw_value
+            else:
+                stored_value = _write_group_raw_values(self.storage, {self.name: raw_value}, version)
+                if stored_value is None:
+                    return False
+                record_changes({self.full_name: raw_value})
+
+            _publish_on_commit([self], {self.storage_name: stored_value}, {self.full_name: raw_value})
+            bump_generation()
+
+        return True
+
+    @property
     def default(self):
+        self.validate_default()
         return self._default
 
+    def validate_default(self):
+        """
+        Raise InvalidDefaultSettingValue if default value is invalid.
+
+        With ``DJSETTINGS_LAZY_VALIDATION`` it is called on first use of the default
+        or by system check instead of on value type creation.
+        """
+        if not self._default_validated:
+            try:
+                self.validate(self._default)
+            except InvalidSettingValue as e:
+                raise InvalidDefaultSettingValue(e)
+            self._default_validated = True
+
     def _get_value_kwargs(self):
         return {
             'required': self._required,
@@ -115,23 +703,68 @@ class BaseValueType:
             'validators': self._validators
         }
 
-    @cached_property
+    @property
     def form_field(self):
+        """Return new form field of the value type, form fields are not kept to save memory."""
         return self.form_field_class(**self._get_value_kwargs())
 
     def validate(self, value):
         value = self.prepare_value(value)
+        form_field = self.form_field
 
         try:
-            value = self.to_python(value)
-            self.form_field.validate(value)
-            self.form_field.run_validators(value)
+            value = form_field.to_python(value)
+            form_field.validate(value)
+            form_field.run_validators(value)
         except (ValidationError, AttributeError, TypeError) as e:
             raise InvalidSettingValue(e)
 
     def to_python(self, value):
         return self.form_field.to_python(value)
 
+    def from_raw(self, raw_value):
+        """Convert stored raw value to python, parsing it only once per change."""
+        if raw_value is not_stored:
+            return self._get_default_value()
+
+        if not self.cache_decoded_value:
+            return self._decode(raw_value)
+
+        decoded = self._decoded
+        if decoded is not None and decoded[0] == raw_value:
+            return decoded[1]
+
+        value = self._decode(raw_value)
+        self._decoded = (raw_value, value)
+        return value
+
+    def _is_decoded(self, raw_value):
+        """Return whether ``from_raw`` returns value decoded before, so it doesn't run queries."""
+        if not self.cache_decoded_value:
+            return False
+
+        if raw_value is not_stored:
+            decoded_default = self._decoded_default
+            return self._default_validated and decoded_default is not None and decoded_default[0] is self._default
+
+        decoded = self._decoded
+        return decoded is not None and decoded[0] == raw_value
+
+    def _get_default_value(self):
+        """Return default value converted like a stored one, so its type doesn't change once value is stored."""
+        if not self.cache_decoded_value:
+            return self._decode(self.to_db(self.default))
+
+        # Keyed on the default object, which is reset when referenced object is deleted
+        decoded_default = self._decoded_default
+        if decoded_default is None or decoded_default[0] is not self._default:
+            raw_value = self.to_db(self.default)
+            decoded_default = self._decoded_default = (self._default, raw_value, self._decode(raw_value))
+        return decoded_default[2]
+
+    def _decode(self, raw_value):
+        return self.to_python(raw_value)
+
     def to_db(self, value):
         if value in self._empty_values:
             return ''
@@ -142,6 +775,8 @@ class BaseValueType:
 
 
 class BooleanValue(BaseValueType):
+    __slots__ = ()
+
     form_field_class = forms.BooleanField
 
     def __init__(self, **kwargs):
@@ -150,6 +785,8 @@ class BooleanValue(BaseValueType):
 
 
 class StringValue(BaseValueType):
+    __slots__ = ('_max_length', '_min_length')
+
     form_field_class = forms.CharField
 
     def __init__(self, *, max_length=None, min_length=None, **kwargs):
@@ -171,6 +808,8 @@ class StringValue(BaseValueType):
 
 
 class DecimalValue(BaseValueType):
+    __slots__ = ('_max_value', '_min_value', '_max_digits', '_decimal_places')
+
     form_field_class = forms.DecimalField
 
     def __init__(self, *, max_value=None, min_value=None, max_digits=None, decimal_places=None, **kwargs):
@@ -193,6 +832,8 @@ class DecimalValue(BaseValueType):
 
 
 class IntegerValue(BaseValueType):
+    __slots__ = ('_max_value', '_min_value')
+
     form_field_class = forms.IntegerField
 
     def __init__(self, *, max_value=None, min_value=None, **kwargs):
@@ -211,32 +852,193 @@ class IntegerValue(BaseValueType):
 
 
 class FloatValue(IntegerValue):
+    __slots__ = ()
+
     form_field_class = forms.FloatField
 
 
+class LazyModelInstance(SimpleLazyObject):
+    """Model instance proxy fetched from database on first access. ``pk`` is available without fetching."""
+
+    def __init__(self, func, pk):
+        self.__dict__['pk'] = pk
+        super().__init__(func)
+
+    def __copy__(self):
+        if self._wrapped is lazy_empty:
+            return type(self)(self._setupfunc, self.pk)
+        return copy.copy(self._wrapped)
+
+
 class ModelChoiceValue(BaseValueType):
+    __slots__ = ('_queryset', '_model', '_cache_mode')
+
     form_field_class = forms.ModelChoiceField
     signals_handlers = {}
 
-    def __init__(self, queryset, **kwargs):
-        self._queryset = queryset
-        self._model = self._queryset.model
+    CACHE_INSTANCE = 'instance'
+    CACHE_LAZY = 'lazy'
+    cache_modes = (CACHE_INSTANCE, CACHE_LAZY, None)
 
-        super().__init__(**kwargs)
+    # Settings generation cached instances were validated at
+    _instances_generation = None
 
-    def contribute_to_class(self, cls, name):
-        super().contribute_to_class(cls, name)
+    def __init__(self, queryset, *, cache_mode=CACHE_INSTANCE, **kwargs):
+        if cache_mode not in self.cache_modes:
+            raise ValueError(f'Invalid cache mode "{cache_mode}", choices are: {self.cache_modes}')
 
-        signals.pre_delete.connect(self._delete_related_value,
-                                   sender=self._model,
-                                   dispatch_uid=f'djsettings.values.ModelChoiceValue.{self.name}')
+        self._queryset = queryset
+        self._model = self._queryset.model
+        self._cache_mode = cache_mode
 
-    def _delete_related_value(self, instance, **kwargs):
-        if self._default == instance:
-            self._default = None
+        super().__init__(**kwargs)
 
-        db_setting = self.update_db(name=self.name, value=None)
-        self.save_to_cache(db_setting)
+        self.cache_decoded_value = cache_mode is not None
+
+    def bind(self, registry, prefix='', storage=None):
+        setting = super().bind(registry, prefix, storage)
+
+        if self._model not in self.signals_handlers:
+            dispatch_uid = f'djsettings.values.ModelChoiceValue.{self._model._meta.label}'
+            signals.pre_delete.connect(ModelChoiceValue._delete_related_values,
+                                       sender=self._model,
+                                       weak=False,
+                                       dispatch_uid=dispatch_uid)
+            signals.post_save.connect(ModelChoiceValue._update_related_values,
+                                      sender=self._model,
+                                      weak=False,
+                                      dispatch_uid=dispatch_uid)
+
+        # Settings of registries freed without unregistering are dropped with them
+        self.signals_handlers.setdefault(self._model, weakref.WeakSet()).add(setting)
+        return setting
+
+    def unbind(self):
+        super().unbind()
+        self.signals_handlers[self._model].discard(self)
+
+    @classmethod
+    def _get_registered_handlers(cls, model):
+        return [setting for setting in cls.signals_handlers.get(model, ()) if setting.registry is not None]
+
+    @classmethod
+    def _delete_related_values(cls, sender, instance, **kwargs):
+        """
+        Reset settings which reference deleted instance.
+
+        All settings of the model are resolved together with one Django cache request,
+        so deleting rows which are not referenced doesn't touch the database. Snapshots
+        and local cache may be stale, so they are not used, and rows are reset only if
+        they still reference the instance.
+        """
+        settings = cls._get_registered_handlers(sender)
+        pk = force_text(instance.pk)
+
+        for setting in settings:
+            if setting._default is not None and force_text(setting.prepare_value(setting._default)) == pk:
+                setting._default = None
+
+        raw_values = _get_shared_raw_values(settings)
+        related_settings = [setting for setting in settings if raw_values.get(setting.full_name) == pk]
+
+        if related_settings:
+            from .models import DjSetting
+            row_names = [setting.storage_name for setting in related_settings if setting.storage is None]
+            group_settings = defaultdict(list)
+            for setting in related_settings:
+                if setting.storage is not None:
+                    group_settings[setting.storage].append(setting)
+
+            with transaction.atomic(using=router.db_for_write(DjSetting)):
+                # Cached values may be stale, only rows still referencing the instance are reset
+                row_names = list(DjSetting.objects.select_for_update().filter(name__in=row_names, raw_value=pk)
+                                 .values_list('name', flat=True))
+                DjSetting.objects.filter(name__in=row_names).update(raw_value='', version=F('version') + 1)
+                stored_values = dict.fromkeys(row_names, '')
+                reset_settings = [setting for setting in related_settings if setting.storage_name in stored_values]
+
+                for storage, storage_settings in group_settings.items():
+                    db_obj = DjSetting.objects.select_for_update().filter(name=storage.name).first()
+                    if db_obj is None:
+                        continue
+
+                    stored_raw_values = storage.decode(db_obj.raw_value)
+                    storage_settings = [setting for setting in storage_settings
+                                        if stored_raw_values.get(setting.name) == pk]
+                    if storage_settings:
+                        stored_values[storage.name] = _write_group_raw_values(
+                            storage, dict.fromkeys([setting.name for setting in storage_settings], ''), db_obj.version)
+                        reset_settings.extend(storage_settings)
+
+                if reset_settings:
+                    reset_raw_values = dict.fromkeys([setting.full_name for setting in reset_settings], '')
+                    record_changes(reset_raw_values)
+                    _publish_on_commit(reset_settings, stored_values, reset_raw_values)
+                    bump_generation()
+
+            delete_many_from_cache([setting for setting in related_settings if setting not in reset_settings])
+
+    @classmethod
+    def _update_related_values(cls, sender, instance, **kwargs):
+        """
+        Drop cached instances of settings which reference saved instance.
+
+        Stored values are resolved like in ``_delete_related_values``. If any setting references
+        the instance, settings generation is increased, so other processes drop their cached
+        instances on next validation, see ``validate_instances``.
+        """
+        settings = cls._get_registered_handlers(sender)
+        pk = force_text(instance.pk)
+
+        for setting in settings:
+            decoded = setting._decoded
+            if decoded is not None and decoded[0] == pk:
+                setting._decoded = None
+
+            decoded_default = setting._decoded_default
+            if decoded_default is not None and decoded_default[1] == pk:
+                setting._decoded_default = None
+
+        raw_values = _get_shared_raw_values(settings)
+        for setting in settings:
+            raw_value = raw_values.get(setting.full_name)
+            if raw_value is not_stored and setting._default is not None:
+                raw_value = force_text(setting.prepare_value(setting._default))
+
+            if raw_value == pk:
+                bump_generation()
+                break
+
+    @classmethod
+    def validate_instances(cls, generation):
+        """Drop cached instances of all settings if settings generation changed since they were validated."""
+        if generation != cls._instances_generation:
+            cls._clear_instances()
+            cls._instances_generation = generation
+
+    @classmethod
+    def advance_instances(cls, generation):
+        """
+        Set generation increased by change made in this process.
+
+        Cached instances are kept, unless other changes were made since they were validated.
+        """
+        if cls._instances_generation is not None and generation != cls._instances_generation + 1:
+            cls._clear_instances()
+        cls._instances_generation = generation
+
+    @classmethod
+    def _clear_instances(cls):
+        for handlers in cls.signals_handlers.values():
+            for setting in handlers:
+                setting._decoded = None
+                setting._decoded_default = None
+
+    def _decode(self, raw_value):
+        if self._cache_mode == self.CACHE_LAZY and raw_value not in self._empty_values:
+            return LazyModelInstance(lambda: self.to_python(raw_value),
+                                     pk=self._model._meta.pk.to_python(raw_value))
+        return super()._decode(raw_value)
 
     def _get_value_kwargs(self):
         value_kwargs = super()._get_value_kwargs()
@@ -20,6 +20,7 @@ setup(
     url='https://github.com/miss-tais/djsettings',
     author='Taisiya Astapenko',
     author_email='taja.astapenko@gmail.com',
+    python_requires='>=3.7',
     install_requires=[
         'django>=2.2',
         'six'
@@ -35,7 +36,9 @@ setup(
         'Operating System :: OS Independent',
         'Programming Language :: Python',
         'Programming Language :: Python :: 3 :: Only',
-        'Programming Language :: Python :: 3.6',
+        'Programming Language :: Python :: 3.7',
+        'Programming Language :: Python :: 3.8',
+        'Programming Language :: Python :: 3.9',
         'Topic :: Utilities',
     ],
 )
\ No newline at end of file
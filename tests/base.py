@@ -1,13 +1,24 @@
-from django.test import TestCase
+from django.test import TransactionTestCase
 from django.core.cache import caches
 
 from djsettings import djsetting
+from djsettings.caches import get_local_cache
+from djsettings.snapshots import set_snapshot
 
 
-class BaseTestCase(TestCase):
+class BaseTestCase(TransactionTestCase):
+    # Changes are published on commit, rows created by migrations are restored after each test
+    serialized_rollback = True
 
     def tearDown(self):
-        caches['default'].clear()
+        for cache in caches.all():
+            cache.clear()
+
+        local_cache = get_local_cache()
+        if local_cache is not None:
+            local_cache.clear()
+
+        set_snapshot(None)
 
         for group in djsetting._get_registered_group_classes():
             djsetting.unregister(group)
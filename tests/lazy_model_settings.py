@@ -0,0 +1,8 @@
+from django.contrib.auth.models import User
+
+from djsettings import djsetting, DjSettingsGroup, values
+
+
+@djsetting.register
+class LazyModelSettings(DjSettingsGroup):
+    test_lazy_user = values.ModelChoiceValue(queryset=User.objects.all(), default=None, required=False)
@@ -0,0 +1,7 @@
+from djsettings import djsetting, DjSettingsGroup, values
+
+
+@djsetting.register
+class LazySettings(DjSettingsGroup):
+    test_lazy_string = values.StringValue(default='lazy string')
+    test_lazy_integer = values.IntegerValue(default=1)
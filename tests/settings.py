@@ -20,6 +20,16 @@ DATABASES = {
     }
 }
 
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'djsettings': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'djsettings',
+    },
+}
+
 ROOT_URLCONF = 'tests.urls'
 
 MIDDLEWARE = [
@@ -59,7 +59,7 @@ class TestAdmin(BaseTestCase):
 
         self.assertEqual(response.context[0]['app_label'], 'djsettings')
         self.assertNotEqual(len(response.context[0]['form'].fields), 0)
-        self.assertNotEqual(DjSetting.objects.all().count(), 0)
+        self.assertEqual(DjSetting.objects.all().count(), 0)
         self.assertContains(response, '<h2>Test settings</h2>')
         self.assertContains(response, 'Test string name')
         self.assertContains(response, 'test sting help text')
@@ -91,8 +91,57 @@ class TestAdmin(BaseTestCase):
                 self.assertEqual(db_djsettings[key], six.text_type(data[key]))
                 self.assertEqual(getattr(djsetting, key), data[key])
             else:
-                value = getattr(djsetting, key)
-                self.assertEqual(db_djsettings[key], '' if not value else value)
+                # unchanged optional settings are not stored, defaults are converted like stored values
+                self.assertNotIn(key, db_djsettings)
+                self.assertEqual(getattr(djsetting, key), '' if key == 'test_string_optional' else None)
+
+    def test_submit_changed_only(self):
+        self.client.login(username='admin', password='admin_pwd')
+
+        data = {
+            'test_string': 'test string setting',
+            'test_boolean': False,
+            'test_integer': 2,
+            'test_decimal': decimal.Decimal(0.01),
+            'test_float': 0.01,
+            'test_model_choice': self.user.id,
+        }
+
+        response = self.client.post('/admin/djsettings/djsetting/', data=data)
+        self.assertIs(response.status_code, 200)
+        self.assertEqual(response.context['form'].changed_data, ['test_integer'])
+
+        self.assertEqual(DjSetting.objects.get(name='test_integer').raw_value, '2')
+        self.assertEqual(djsetting.test_integer, 2)
+
+    def test_submit_changed_meanwhile(self):
+        self.client.login(username='admin', password='admin_pwd')
+
+        response = self.client.get('/admin/djsettings/djsetting/')
+        versions = response.context['form']['djsettings_versions'].value()
+
+        djsetting.test_integer = 3
+
+        data = {
+            'djsettings_versions': versions,
+            'test_string': 'test string setting',
+            'test_boolean': False,
+            'test_integer': 2,
+            'test_decimal': decimal.Decimal(0.01),
+            'test_float': 0.01,
+            'test_model_choice': self.user.id,
+        }
+
+        response = self.client.post('/admin/djsettings/djsetting/', data=data)
+        self.assertIs(response.status_code, 200)
+        self.assertContains(response, 'DjSettings were changed by someone else')
+        self.assertEqual(response.context['form']['test_integer'].value(), 3)
+        self.assertEqual(djsetting.test_integer, 3)
+
+        data['djsettings_versions'] = response.context['form']['djsettings_versions'].value()
+        response = self.client.post('/admin/djsettings/djsetting/', data=data)
+        self.assertContains(response, 'DjSettings updated successfully.')
+        self.assertEqual(djsetting.test_integer, 2)
 
     def test_required_field_submit(self):
         self.client.login(username='admin', password='admin_pwd')
@@ -0,0 +1,238 @@
+import threading
+from unittest import mock
+
+from django.core.cache import caches
+from django.test import SimpleTestCase, override_settings
+
+from djsettings import djsetting, DjSettingsGroup, values
+from djsettings.caches import LocalCache, SingleFlight, get_local_cache
+from djsettings.models import DjSetting
+
+from .base import BaseTestCase
+
+
+class TestLocalCache(SimpleTestCase):
+    def test_get_set(self):
+        local_cache = LocalCache(max_size=2, timeout=None)
+        local_cache.set('a', 1)
+
+        self.assertEqual(local_cache.get('a'), 1)
+        self.assertIsNone(local_cache.get('b'))
+
+    def test_lru_eviction(self):
+        local_cache = LocalCache(max_size=2, timeout=None)
+        local_cache.set('a', 1)
+        local_cache.set('b', 2)
+        local_cache.get('a')
+        local_cache.set('c', 3)
+
+        self.assertEqual(local_cache.get('a'), 1)
+        self.assertIsNone(local_cache.get('b'))
+        self.assertEqual(local_cache.get('c'), 3)
+
+    def test_timeout(self):
+        local_cache = LocalCache(max_size=2, timeout=5)
+
+        with mock.patch('djsettings.caches.time.monotonic', return_value=100):
+            local_cache.set('a', 1)
+            self.assertEqual(local_cache.get('a'), 1)
+
+        with mock.patch('djsettings.caches.time.monotonic', return_value=105):
+            self.assertIsNone(local_cache.get('a'))
+        self.assertEqual(len(local_cache), 0)
+
+    @override_settings(DJSETTINGS_LOCAL_CACHE=False)
+    def test_disabled(self):
+        self.assertIsNone(get_local_cache())
+
+
+@override_settings(DJSETTINGS_LOCAL_CACHE=True)
+class TestLocalCacheReads(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+
+        @djsetting.register
+        class TestSetting(DjSettingsGroup):
+            test_integer = values.IntegerValue(default=1)
+
+    def test_read_served_from_local_cache(self):
+        self.assertEqual(djsetting.test_integer, 1)
+
+        with mock.patch('djsettings.values.caches') as shared_caches:
+            self.assertEqual(djsetting.test_integer, 1)
+            shared_caches.__getitem__.assert_not_called()
+
+    def test_set_updates_local_cache(self):
+        self.assertEqual(djsetting.test_integer, 1)
+        djsetting.test_integer = 2
+
+        with mock.patch('djsettings.values.caches') as shared_caches:
+            self.assertEqual(djsetting.test_integer, 2)
+            shared_caches.__getitem__.assert_not_called()
+
+    def test_bounded_staleness(self):
+        self.assertEqual(djsetting.test_integer, 1)
+
+        # Change made by another process is visible after local cache entry expires
+        cache_key = djsetting.get_setting('test_integer')._get_cache_key('test_integer')
+        caches['default'].set(cache_key, '3')
+        self.assertEqual(djsetting.test_integer, 1)
+
+        get_local_cache().delete(cache_key)
+        self.assertEqual(djsetting.test_integer, 3)
+
+
+class TestSingleFlight(SimpleTestCase):
+    def test_concurrent_calls_coalesced(self):
+        single_flight = SingleFlight()
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+        results = []
+
+        def load():
+            calls.append(1)
+            started.set()
+            release.wait()
+            return 'value'
+
+        def worker():
+            results.append(single_flight.do('key', load))
+
+        leader = threading.Thread(target=worker)
+        leader.start()
+        started.wait()
+
+        followers = [threading.Thread(target=worker) for _ in range(3)]
+        for follower in followers:
+            follower.start()
+
+        release.set()
+        for thread in [leader] + followers:
+            thread.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, ['value'] * 4)
+
+    def test_error(self):
+        single_flight = SingleFlight()
+
+        def load():
+            raise ValueError
+
+        with self.assertRaises(ValueError):
+            single_flight.do('key', load)
+
+        self.assertEqual(single_flight.do('key', lambda: 'value'), 'value')
+
+
+@override_settings(DJSETTINGS_MISS_LOCK=True, DJSETTINGS_MISS_LOCK_TIMEOUT=1, DJSETTINGS_MISS_LOCK_WAIT_INTERVAL=0.01)
+class TestMissLock(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+
+        @djsetting.register
+        class TestSetting(DjSettingsGroup):
+            test_integer = values.IntegerValue(default=1)
+            test_integer_lock = values.BooleanValue(default=True)
+
+        self.cache_key = djsetting.get_setting('test_integer').cache_key
+        self.lock_key = djsetting.get_setting('test_integer').lock_key
+
+    def test_lock_released(self):
+        self.assertEqual(djsetting.test_integer, 1)
+        self.assertIsNone(caches['default'].get(self.lock_key))
+
+    def test_wait_for_lock_holder(self):
+        caches['default'].add(self.lock_key, True)
+
+        def refill(interval):
+            caches['default'].set(self.cache_key, '2')
+
+        with mock.patch('djsettings.values.time.sleep', side_effect=refill), self.assertNumQueries(0):
+            self.assertEqual(djsetting.test_integer, 2)
+
+    def test_lock_holder_timeout(self):
+        caches['default'].add(self.lock_key, True)
+
+        DjSetting.objects.create(name='test_integer', raw_value='3')
+
+        with mock.patch('djsettings.values.time.monotonic', side_effect=[0, 0, 2]):
+            self.assertEqual(djsetting.test_integer, 3)
+
+        self.assertEqual(caches['default'].get(self.cache_key), '3')
+
+    def test_lock_key_of_other_setting(self):
+        # Value of setting named like the lock is not taken for the lock
+        djsetting.test_integer_lock = False
+
+        with mock.patch('djsettings.values.time.sleep') as sleep:
+            self.assertEqual(djsetting.test_integer, 1)
+        sleep.assert_not_called()
+
+        # Releasing the lock keeps value of setting named like it
+        other_cache_key = djsetting.get_setting('test_integer_lock').cache_key
+        self.assertIsNotNone(caches['default'].get(other_cache_key))
+
+        # Lock is not taken for value of setting named like it
+        caches['default'].add(self.lock_key, True)
+        self.assertIs(djsetting.test_integer_lock, False)
+
+
+class TestCacheOptions(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+
+        @djsetting.register
+        class TestSetting(DjSettingsGroup):
+            test_integer = values.IntegerValue(default=1)
+            test_string = values.StringValue(default='test', cache_alias='default', cache_timeout=60,
+                                             cache_key_prefix='test_', cache_version=2)
+
+            class Meta:
+                cache_alias = 'djsettings'
+                cache_timeout = None
+
+    def test_group_options(self):
+        djsetting.test_integer = 2
+        dj_setting = djsetting.get_setting('test_integer')
+
+        self.assertEqual(dj_setting.cache_alias, 'djsettings')
+        self.assertIsNone(dj_setting.cache_timeout)
+        self.assertEqual(caches['djsettings'].get('djsettings_test_integer'), '2')
+        self.assertIsNone(caches['default'].get('djsettings_test_integer'))
+
+    def test_value_options(self):
+        djsetting.test_string = 'test 2'
+
+        self.assertEqual(caches['default'].get('test_test_string', version=2), 'test 2')
+        self.assertIsNone(caches['djsettings'].get('test_test_string', version=2))
+
+    def test_bulk_access(self):
+        djsetting.set_many({'test_integer': 2, 'test_string': 'test 2'})
+        caches['djsettings'].clear()
+
+        with self.assertNumQueries(1):
+            self.assertEqual(djsetting.as_dict(), {'test_integer': 2, 'test_string': 'test 2'})
+
+        with self.assertNumQueries(0):
+            self.assertEqual(djsetting.as_dict(), {'test_integer': 2, 'test_string': 'test 2'})
+
+    def test_invalidate(self):
+        djsetting.test_integer = 2
+        djsetting.invalidate(['test_integer'])
+
+        self.assertIsNone(caches['djsettings'].get('djsettings_test_integer'))
+        self.assertEqual(djsetting.test_integer, 2)
+
+    def test_invalid_cache_alias(self):
+        with self.assertRaises(ValueError):
+            class TestInvalidSetting(DjSettingsGroup):
+                test_invalid = values.IntegerValue(default=1)
+
+                class Meta:
+                    cache_alias = 'invalid'
+
+    def test_invalid_cache_timeout(self):
+        with self.assertRaises(ValueError):
+            values.IntegerValue(default=1, cache_timeout=-1)
@@ -0,0 +1,142 @@
+import datetime
+
+from django.core.management import call_command
+from django.utils import timezone
+
+from djsettings import djsetting, DjSettingsGroup, values
+from djsettings.changes import ChangeLogReplica, get_changes, delete_old_changes
+from djsettings.models import DjSetting, DjSettingChange
+
+from .base import BaseTestCase
+
+
+class TestChangeLog(BaseTestCase):
+    def setUp(self):
+        super(TestChangeLog, self).setUp()
+
+        @djsetting.register
+        class TestSetting(DjSettingsGroup):
+            test_integer = values.IntegerValue(default=1)
+            test_string = values.StringValue(default='test')
+
+    def test_changes_recorded(self):
+        djsetting.test_integer = 2
+        djsetting.set_many({'test_integer': 3, 'test_string': 'test 2'})
+
+        changes = [(name, raw_value) for change_id, name, raw_value in get_changes()]
+        self.assertEqual(changes, [('test_integer', '2'), ('test_integer', '3'), ('test_string', 'test 2')])
+
+    def test_changes_since(self):
+        djsetting.test_integer = 2
+        last_change_id = get_changes()[-1][0]
+        djsetting.test_string = 'test 2'
+
+        with self.assertNumQueries(1):
+            changes = get_changes(last_change_id)
+        self.assertEqual([(name, raw_value) for change_id, name, raw_value in changes], [('test_string', 'test 2')])
+
+    def test_delete_old_changes(self):
+        djsetting.test_integer = 2
+
+        delete_old_changes(timezone.now() - datetime.timedelta(days=1))
+        self.assertEqual(DjSettingChange.objects.count(), 1)
+
+        delete_old_changes(timezone.now() + datetime.timedelta(days=1))
+        self.assertEqual(DjSettingChange.objects.count(), 0)
+
+
+class TestChangeLogReplica(BaseTestCase):
+    def setUp(self):
+        super(TestChangeLogReplica, self).setUp()
+
+        @djsetting.register
+        class TestSetting(DjSettingsGroup):
+            test_integer = values.IntegerValue(default=1)
+            test_string = values.StringValue(default='test')
+
+        djsetting.test_integer = 2
+
+    def test_refresh(self):
+        replica = ChangeLogReplica()
+
+        self.assertTrue(replica.refresh())
+        self.assertEqual(replica.raw_values, {'test_integer': '2'})
+
+        with self.assertNumQueries(1):
+            self.assertFalse(replica.refresh())
+
+        djsetting.set_many({'test_integer': 3, 'test_string': 'test 2'})
+
+        with self.assertNumQueries(1):
+            self.assertTrue(replica.refresh())
+        self.assertEqual(replica.raw_values, {'test_integer': '3', 'test_string': 'test 2'})
+
+    def test_deleted_setting(self):
+        DjSetting.objects.create(name='test_old', raw_value='old')
+
+        replica = ChangeLogReplica()
+        replica.refresh()
+        self.assertEqual(replica.raw_values['test_old'], 'old')
+
+        call_command('delete_old_settings')
+
+        replica.refresh()
+        self.assertNotIn('test_old', replica.raw_values)
+
+    def test_out_of_order_commit(self):
+        replica = ChangeLogReplica()
+        replica.refresh()
+
+        djsetting.test_integer = 3
+        djsetting.test_string = 'test 2'
+        first_id, second_id = DjSettingChange.objects.order_by('-id').values_list('id', flat=True)[:2][::-1]
+
+        # change with lower id is committed later
+        first_change = DjSettingChange.objects.get(id=first_id)
+        first_change.delete()
+
+        replica.refresh()
+        self.assertEqual(replica.raw_values, {'test_integer': '2', 'test_string': 'test 2'})
+
+        DjSettingChange.objects.create(id=first_id, name='test_integer', raw_value='3')
+
+        replica.refresh()
+        self.assertEqual(replica.raw_values, {'test_integer': '3', 'test_string': 'test 2'})
+
+    def test_late_change_does_not_override_newer(self):
+        replica = ChangeLogReplica()
+        replica.refresh()
+
+        djsetting.test_integer = 3
+        djsetting.test_integer = 4
+        first_id = DjSettingChange.objects.order_by('-id').values_list('id', flat=True)[1]
+
+        first_change = DjSettingChange.objects.get(id=first_id)
+        first_change.delete()
+
+        replica.refresh()
+        self.assertEqual(replica.raw_values['test_integer'], '4')
+
+        DjSettingChange.objects.create(id=first_id, name='test_integer', raw_value='3')
+
+        replica.refresh()
+        self.assertEqual(replica.raw_values['test_integer'], '4')
+
+    def test_uncommitted_change_on_load(self):
+        djsetting.test_integer = 3
+        djsetting.test_string = 'test 2'
+        first_id = DjSettingChange.objects.order_by('-id').values_list('id', flat=True)[1]
+
+        # change with lower id is not committed yet while replica is loaded
+        DjSettingChange.objects.get(id=first_id).delete()
+        DjSetting.objects.filter(name='test_integer').update(raw_value='2')
+
+        replica = ChangeLogReplica()
+        replica.refresh()
+        self.assertEqual(replica.raw_values, {'test_integer': '2', 'test_string': 'test 2'})
+
+        DjSetting.objects.filter(name='test_integer').update(raw_value='3')
+        DjSettingChange.objects.create(id=first_id, name='test_integer', raw_value='3')
+
+        self.assertTrue(replica.refresh())
+        self.assertEqual(replica.raw_values, {'test_integer': '3', 'test_string': 'test 2'})
@@ -1,8 +1,12 @@
-from django.core.management import call_command
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command, CommandError
 
 from djsettings import djsetting, DjSettingsGroup, values
-from djsettings.models import DjSetting
+from djsettings.models import DjSetting, DjSettingChange
 from djsettings.exceptions import SettingNotRegistered
+from djsettings.registries import DjSettingsRegistry
 
 from tests.base import BaseTestCase
 
@@ -17,6 +21,7 @@ class CommandsTestCase(BaseTestCase):
         djsetting.register(TestSetting)
 
         self.assertEqual(default, djsetting.test_string)
+        djsetting.test_string = 'test 1'
         self.assertEqual(DjSetting.objects.all().count(), 1)
         
         djsetting.unregister(TestSetting)
@@ -25,3 +30,80 @@ class CommandsTestCase(BaseTestCase):
         with self.assertRaises(SettingNotRegistered):
             djsetting.test_string = 'test 2'
         self.assertEqual(DjSetting.objects.all().count(), 0)
+
+    def test_delete_old_settings_other_registry(self):
+        registry = DjSettingsRegistry()
+
+        @registry.register
+        class TestSetting(DjSettingsGroup):
+            test_string = values.StringValue(default='test')
+
+        registry.test_string = 'test 1'
+        call_command('delete_old_settings')
+
+        self.assertEqual(DjSetting.objects.get().name, 'test_string')
+
+
+class SyncCommandTestCase(BaseTestCase):
+    def setUp(self):
+        super(SyncCommandTestCase, self).setUp()
+
+        @djsetting.register
+        class TestSetting(DjSettingsGroup):
+            test_string = values.StringValue(default='test')
+            test_integer = values.IntegerValue(default=1)
+
+        DjSetting.objects.create(name='test_integer', raw_value='2')
+        DjSetting.objects.create(name='test_old', raw_value='old')
+
+    def test_sync(self):
+        # select, begin, bulk insert, select of inserted rows, change log insert, generation update and select
+        with self.assertNumQueries(7):
+            call_command('sync_djsettings', stdout=StringIO())
+
+        self.assertEqual(dict(DjSetting.objects.values_list('name', 'raw_value')),
+                         {'test_string': 'test', 'test_integer': '2', 'test_old': 'old'})
+
+        with self.assertNumQueries(0):
+            self.assertEqual(djsetting.as_dict(), {'test_string': 'test', 'test_integer': 2})
+
+    def test_sync_concurrently_created(self):
+        bulk_create = DjSetting.objects.bulk_create
+
+        def create_concurrently(objs, **kwargs):
+            DjSetting.objects.create(name='test_string', raw_value='concurrent')
+            return bulk_create(objs, **kwargs)
+
+        with mock.patch.object(DjSetting.objects, 'bulk_create', side_effect=create_concurrently):
+            call_command('sync_djsettings', stdout=StringIO())
+
+        self.assertEqual(DjSetting.objects.get(name='test_string').raw_value, 'concurrent')
+        self.assertFalse(DjSettingChange.objects.filter(name='test_string').exists())
+        with self.assertNumQueries(0):
+            self.assertEqual(djsetting.test_string, 'concurrent')
+
+    def test_sync_prune(self):
+        call_command('sync_djsettings', prune=True, stdout=StringIO())
+
+        self.assertEqual(dict(DjSetting.objects.values_list('name', 'raw_value')),
+                         {'test_string': 'test', 'test_integer': '2'})
+
+    def test_check(self):
+        with self.assertRaises(CommandError):
+            call_command('sync_djsettings', check=True, stdout=StringIO())
+
+        call_command('sync_djsettings', stdout=StringIO())
+        call_command('sync_djsettings', check=True, stdout=StringIO())
+
+        with self.assertRaises(CommandError):
+            call_command('sync_djsettings', check=True, prune=True, stdout=StringIO())
+
+    def test_dry_run(self):
+        stdout = StringIO()
+
+        with self.assertNumQueries(1):
+            call_command('sync_djsettings', dry_run=True, prune=True, stdout=stdout)
+
+        self.assertIn('Missing: test_string', stdout.getvalue())
+        self.assertIn('Orphaned: test_old', stdout.getvalue())
+        self.assertEqual(DjSetting.objects.count(), 2)
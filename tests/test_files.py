@@ -0,0 +1,143 @@
+import os
+import tempfile
+import time
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from djsettings.files import SharedSnapshot, SnapshotFile
+
+
+class TestSnapshotFile(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'snapshot')
+        self.file = SnapshotFile(self.path)
+
+    def test_write_read(self):
+        self.assertIsNone(self.file.read())
+        self.assertIsNone(self.file.read_generation())
+
+        self.file.write(3, {'test_string': 'test', 'test_integer': '2'})
+
+        self.assertEqual(self.file.read(), (3, {'test_string': 'test', 'test_integer': '2'}))
+        self.assertEqual(self.file.read_generation(), 3)
+        self.assertEqual(os.listdir(os.path.dirname(self.path)), ['snapshot'])
+
+    def test_invalid_file(self):
+        for content in (b'', b'DJS1', b'invalid file content'):
+            with open(self.path, 'wb') as f:
+                f.write(content)
+
+            with self.assertRaises(ValueError):
+                self.file.read()
+            self.assertIsNone(self.file.read_generation())
+
+    def test_truncated_payload(self):
+        self.file.write(1, {'test_string': 'test'})
+        with open(self.path, 'r+b') as f:
+            f.truncate(os.path.getsize(self.path) - 1)
+
+        with self.assertRaises(ValueError):
+            self.file.read()
+
+    def test_failed_write_keeps_file(self):
+        self.file.write(1, {'test_string': 'test'})
+
+        with mock.patch('djsettings.files.os.replace', side_effect=OSError):
+            with self.assertRaises(OSError):
+                self.file.write(2, {'test_string': 'test 2'})
+
+        self.assertEqual(self.file.read(), (1, {'test_string': 'test'}))
+        self.assertEqual(sorted(os.listdir(os.path.dirname(self.path))), ['snapshot'])
+
+    def test_publish(self):
+        self.assertTrue(self.file.publish(2, {'test_string': 'test 2'}))
+        self.assertFalse(self.file.publish(1, {'test_string': 'test'}))
+        self.assertFalse(self.file.publish(2, {'test_string': 'test'}))
+        self.assertEqual(self.file.read(), (2, {'test_string': 'test 2'}))
+
+        self.assertTrue(self.file.publish(1, {'test_string': 'test'}, force=True))
+        self.assertEqual(self.file.read(), (1, {'test_string': 'test'}))
+
+
+class TestSharedSnapshot(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.file = SnapshotFile(os.path.join(directory.name, 'snapshot'))
+
+    def test_get(self):
+        shared_snapshot = SharedSnapshot(self.file.path, check_interval=0)
+        self.assertIsNone(shared_snapshot.get())
+
+        self.file.write(1, {'test_string': 'test'})
+        self.assertEqual(dict(shared_snapshot.get()), {'test_string': 'test'})
+        self.assertEqual(shared_snapshot.generation, 1)
+
+        self.file.write(2, {'test_string': 'test 2'})
+        self.assertEqual(dict(shared_snapshot.get()), {'test_string': 'test 2'})
+
+        os.unlink(self.file.path)
+        self.assertIsNone(shared_snapshot.get())
+
+    def test_file_read_once_per_change(self):
+        self.file.write(1, {'test_string': 'test'})
+        shared_snapshot = SharedSnapshot(self.file.path, check_interval=0)
+
+        with mock.patch.object(SnapshotFile, 'read', wraps=self.file.read) as read:
+            raw_values = shared_snapshot.get()
+            self.assertIs(shared_snapshot.get(), raw_values)
+        read.assert_called_once_with()
+
+    def test_check_interval(self):
+        self.file.write(1, {'test_string': 'test'})
+        shared_snapshot = SharedSnapshot(self.file.path, check_interval=60)
+        shared_snapshot.get()
+
+        self.file.write(2, {'test_string': 'test 2'})
+        self.assertEqual(dict(shared_snapshot.get()), {'test_string': 'test'})
+
+        shared_snapshot.check()
+        self.assertEqual(dict(shared_snapshot.get()), {'test_string': 'test 2'})
+
+    def test_invalid_file_ignored(self):
+        with open(self.file.path, 'wb') as f:
+            f.write(b'invalid file content')
+
+        shared_snapshot = SharedSnapshot(self.file.path, check_interval=0)
+        with self.assertLogs('djsettings', 'WARNING'):
+            self.assertIsNone(shared_snapshot.get())
+
+    def test_max_age(self):
+        self.file.write(1, {'test_string': 'test'})
+        shared_snapshot = SharedSnapshot(self.file.path, check_interval=0, max_age=60)
+        self.assertEqual(dict(shared_snapshot.get()), {'test_string': 'test'})
+
+        # Publisher stopped refreshing the file
+        modified = time.time() - 120
+        os.utime(self.file.path, (modified, modified))
+        with self.assertLogs('djsettings', 'WARNING'):
+            self.assertIsNone(shared_snapshot.get())
+
+        self.assertTrue(self.file.touch())
+        self.assertEqual(dict(shared_snapshot.get()), {'test_string': 'test'})
+
+    def test_touch_doesnt_reread_file(self):
+        self.file.write(1, {'test_string': 'test'})
+        shared_snapshot = SharedSnapshot(self.file.path, check_interval=0, max_age=60)
+        raw_values = shared_snapshot.get()
+
+        self.file.touch()
+        with mock.patch.object(SnapshotFile, 'read') as read:
+            self.assertIs(shared_snapshot.get(), raw_values)
+        read.assert_not_called()
+
+    def test_update(self):
+        self.file.write(1, {'test_string': 'test'})
+        shared_snapshot = SharedSnapshot(self.file.path, check_interval=60)
+        shared_snapshot.get()
+
+        shared_snapshot.update({'test_integer': '2'})
+        self.assertEqual(dict(shared_snapshot.get()), {'test_string': 'test', 'test_integer': '2'})
@@ -0,0 +1,107 @@
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models import F
+from django.test import override_settings
+
+from djsettings import djsetting, DjSettingsGroup, values
+from djsettings.caches import get_local_cache
+from djsettings.generations import get_generation, bump_generation, validate_local_cache
+from djsettings.models import DjSettingsGeneration
+
+from .base import BaseTestCase
+
+
+class TestGeneration(BaseTestCase):
+    def setUp(self):
+        super(TestGeneration, self).setUp()
+
+        @djsetting.register
+        class TestSetting(DjSettingsGroup):
+            test_integer = values.IntegerValue(default=1)
+            test_string = values.StringValue(default='test')
+
+    def test_changes_bump_generation(self):
+        generation = get_generation()
+
+        djsetting.test_integer = 2
+        self.assertEqual(get_generation(), generation + 1)
+
+        djsetting.set_many({'test_integer': 3, 'test_string': 'test 2'})
+        self.assertEqual(get_generation(), generation + 2)
+
+    def test_unchanged_value(self):
+        generation = get_generation()
+
+        # assignment doesn't read current value, so it is always written
+        djsetting.test_integer = 1
+        self.assertEqual(get_generation(), generation + 1)
+
+    def test_rolled_back_change(self):
+        djsetting.test_integer = 2
+        generation = get_generation()
+
+        with self.assertRaises(ValueError), transaction.atomic():
+            djsetting.test_integer = 3
+            djsetting.set_many({'test_string': 'test 2'})
+            raise ValueError
+
+        self.assertEqual(get_generation(), generation)
+        self.assertEqual(djsetting.as_dict(), {'test_integer': 2, 'test_string': 'test'})
+
+        # Generation of rolled back change is not reused
+        djsetting.test_integer = 4
+        self.assertEqual(get_generation(), generation + 1)
+        self.assertEqual(get_generation(), DjSettingsGeneration.objects.get().generation)
+
+    def test_generation_cached(self):
+        bump_generation()
+
+        with self.assertNumQueries(0):
+            generation = get_generation()
+
+        caches['default'].clear()
+
+        with self.assertNumQueries(1):
+            self.assertEqual(get_generation(), generation)
+
+    def test_generation_row_missing(self):
+        DjSettingsGeneration.objects.all().delete()
+
+        self.assertEqual(bump_generation(), 1)
+
+
+@override_settings(DJSETTINGS_LOCAL_CACHE=True)
+class TestLocalCacheValidation(BaseTestCase):
+    def setUp(self):
+        super(TestLocalCacheValidation, self).setUp()
+
+        @djsetting.register
+        class TestSetting(DjSettingsGroup):
+            test_integer = values.IntegerValue(default=1)
+            test_string = values.StringValue(default='test')
+
+        validate_local_cache()
+
+    def test_change_in_other_process(self):
+        self.assertEqual(djsetting.test_integer, 1)
+
+        # other process changes setting and bumps generation
+        cache_key = djsetting.get_setting('test_integer')._get_cache_key('test_integer')
+        caches['default'].set(cache_key, '2')
+        DjSettingsGeneration.objects.update(generation=F('generation') + 1)
+        caches['default'].delete('djsettings_:generation')
+
+        self.assertEqual(djsetting.test_integer, 1)
+
+        validate_local_cache()
+        self.assertEqual(djsetting.test_integer, 2)
+
+    def test_change_in_this_process(self):
+        self.assertEqual(djsetting.test_string, 'test')
+        djsetting.test_integer = 2
+
+        self.assertEqual(len(get_local_cache()), 2)
+
+        with self.assertNumQueries(0):
+            validate_local_cache()
+        self.assertEqual(len(get_local_cache()), 2)
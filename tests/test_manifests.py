@@ -0,0 +1,146 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command, CommandError
+from django.test import override_settings
+
+from djsettings import autodiscover, djsetting, DjSettingsGroup, values
+from djsettings.exceptions import SettingNotRegistered
+from djsettings.models import DjSetting
+
+from .base import BaseTestCase
+
+
+MANIFEST = {'test_lazy_string': 'tests.lazy_settings', 'test_lazy_integer': 'tests.lazy_settings'}
+
+
+class TestLazyAutodiscovery(BaseTestCase):
+    def setUp(self):
+        super(TestLazyAutodiscovery, self).setUp()
+        sys.modules.pop('tests.lazy_settings', None)
+        sys.modules.pop('tests.lazy_model_settings', None)
+
+    def tearDown(self):
+        djsetting.set_manifest({})
+        sys.modules.pop('tests.lazy_settings', None)
+        sys.modules.pop('tests.lazy_model_settings', None)
+        super(TestLazyAutodiscovery, self).tearDown()
+
+    def autodiscover(self, manifest):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'manifest.json')
+            with open(path, 'w') as f:
+                json.dump(manifest, f)
+
+            with override_settings(DJSETTINGS_AUTODISCOVER_MANIFEST=path):
+                autodiscover()
+
+    def test_package_import(self):
+        code = 'import sys, djsettings; print(sorted(m for m in sys.modules if m.startswith("djsettings")))'
+        output = subprocess.check_output([sys.executable, '-c', code], env={**os.environ, 'PYTHONPATH': os.getcwd()})
+
+        self.assertEqual(output.decode().strip(), "['djsettings']")
+
+    def test_module_imported_on_access(self):
+        djsetting.set_manifest(MANIFEST)
+        self.assertNotIn('tests.lazy_settings', sys.modules)
+
+        self.assertEqual(djsetting.test_lazy_string, 'lazy string')
+        self.assertIn('tests.lazy_settings', sys.modules)
+
+    def test_module_imported_on_assignment(self):
+        djsetting.set_manifest(MANIFEST)
+
+        djsetting.test_lazy_integer = 2
+        self.assertEqual(djsetting.get_many(['test_lazy_integer']), {'test_lazy_integer': 2})
+
+    def test_all_modules_imported(self):
+        @djsetting.register
+        class TestSetting(DjSettingsGroup):
+            test_string = values.StringValue(default='test')
+
+        djsetting.set_manifest(MANIFEST)
+
+        self.assertEqual(djsetting.as_dict(), {
+            'test_string': 'test',
+            'test_lazy_string': 'lazy string',
+            'test_lazy_integer': 1,
+        })
+
+    def test_not_in_manifest(self):
+        djsetting.set_manifest(MANIFEST)
+
+        with self.assertRaises(SettingNotRegistered):
+            djsetting.get_setting('test_unknown')
+        self.assertNotIn('tests.lazy_settings', sys.modules)
+
+    def test_autodiscover(self):
+        self.autodiscover({'settings': MANIFEST, 'model_choice_modules': []})
+
+        self.assertNotIn('tests.lazy_settings', sys.modules)
+        self.assertEqual(djsetting.test_lazy_integer, 1)
+
+    def test_model_choice_modules_imported(self):
+        user = User.objects.create_user('test')
+        self.autodiscover({
+            'settings': {**MANIFEST, 'test_lazy_user': 'tests.lazy_model_settings'},
+            'model_choice_modules': ['tests.lazy_model_settings'],
+        })
+
+        self.assertNotIn('tests.lazy_settings', sys.modules)
+        self.assertIn('tests.lazy_model_settings', sys.modules)
+
+        # Stored before the module was accessed in this process
+        DjSetting.objects.create(name='test_lazy_user', raw_value=str(user.pk))
+        user.delete()
+        self.assertIsNone(djsetting.test_lazy_user)
+
+    def test_autodiscover_outdated_manifest(self):
+        with self.assertLogs('djsettings', 'WARNING'):
+            self.autodiscover(MANIFEST)
+
+        self.assertIn('tests.lazy_settings', sys.modules)
+        self.assertEqual(djsetting.test_lazy_integer, 1)
+
+    def test_autodiscover_without_manifest_file(self):
+        with override_settings(DJSETTINGS_AUTODISCOVER_MANIFEST='/nonexistent/manifest.json'), \
+                self.assertLogs('djsettings', 'WARNING'):
+            autodiscover()
+
+        with self.assertRaises(SettingNotRegistered):
+            djsetting.get_setting('test_lazy_string')
+
+
+class TestManifestCommand(BaseTestCase):
+    def test_manifest(self):
+        @djsetting.register
+        class TestSetting(DjSettingsGroup):
+            test_string = values.StringValue(default='test')
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'manifest.json')
+            call_command('djsettings_manifest', path, stdout=StringIO())
+
+            with open(path) as f:
+                self.assertEqual(json.load(f), {'settings': {'test_string': __name__}, 'model_choice_modules': []})
+
+    def test_model_choice_modules(self):
+        @djsetting.register
+        class TestSetting(DjSettingsGroup):
+            test_user = values.ModelChoiceValue(queryset=User.objects.all(), default=None, required=False)
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'manifest.json')
+            call_command('djsettings_manifest', path, stdout=StringIO())
+
+            with open(path) as f:
+                self.assertEqual(json.load(f)['model_choice_modules'], [__name__])
+
+    def test_path_required(self):
+        with self.assertRaises(CommandError):
+            call_command('djsettings_manifest')
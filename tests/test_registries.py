@@ -0,0 +1,475 @@
+import asyncio
+import decimal
+import os
+import tempfile
+import threading
+import time
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.test import override_settings
+
+from djsettings import djsetting, DjSettingsGroup, values
+from djsettings.asyncs import sync_to_thread
+from djsettings.files import SnapshotFile
+from djsettings.models import DjSetting
+from djsettings.registries import DjSettingsRegistry, get_registered_settings
+from djsettings.snapshots import get_snapshot, settings_snapshot
+from djsettings.exceptions import SettingAlreadyRegistered, SettingNotRegistered, InvalidSettingValue
+
+from .base import BaseTestCase
+
+
+class TestRegistry(BaseTestCase):
+    def test_register(self):
+        class TestSettings(DjSettingsGroup):
+            test_string = values.StringValue(default='test string')
+
+        djsetting.register(TestSettings)
+
+        self.assertEqual(list(dir(djsetting)), ['test_string'])
+        self.assertEqual(djsetting.test_string, 'test string')
+
+        djsetting.unregister(TestSettings)
+
+        self.assertEqual(list(dir(djsetting)), [])
+        with self.assertRaises(AttributeError):
+            djsetting.test_string
+        with self.assertRaises(SettingNotRegistered):
+            djsetting.test_string = 'test'
+
+    def test_already_registered(self):
+        @djsetting.register
+        class TestSettings(DjSettingsGroup):
+            test_string = values.StringValue(default='test string')
+
+        class TestOtherSettings(DjSettingsGroup):
+            test_integer = values.IntegerValue(default=1)
+            test_string = values.StringValue(default='test other string')
+
+        with self.assertRaises(SettingAlreadyRegistered):
+            djsetting.register(TestOtherSettings)
+
+        # failed registration leaves registry unchanged
+        self.assertEqual(list(dir(djsetting)), ['test_string'])
+        self.assertEqual([group.__name__ for group in djsetting._get_registered_group_classes()], ['TestSettings'])
+        self.assertEqual(djsetting.test_string, 'test string')
+
+    def test_independent_registries(self):
+        registry = DjSettingsRegistry()
+
+        @registry.register
+        class TestSettings(DjSettingsGroup):
+            test_string = values.StringValue(default='test string')
+
+        self.assertEqual(list(dir(registry)), ['test_string'])
+        self.assertEqual(list(dir(djsetting)), [])
+        with self.assertRaises(SettingNotRegistered):
+            djsetting.get_setting('test_string')
+
+        registry.test_string = 'test string 2'
+        self.assertEqual(registry.test_string, 'test string 2')
+        self.assertEqual(registry.as_dict(), {'test_string': 'test string 2'})
+
+    def test_group_in_namespaced_registry(self):
+        class TestSettings(DjSettingsGroup):
+            test_string = values.StringValue(default='test string')
+
+        djsetting.register(TestSettings)
+        registry = DjSettingsRegistry('features')
+        registry.register(TestSettings)
+
+        djsetting.test_string = 'default registry'
+        registry.test_string = 'features registry'
+
+        self.assertEqual(djsetting.test_string, 'default registry')
+        self.assertEqual(registry.test_string, 'features registry')
+        self.assertEqual(dict(DjSetting.objects.values_list('name', 'raw_value')),
+                         {'test_string': 'default registry', 'features.test_string': 'features registry'})
+
+        # Group instances of registries access their own settings
+        groups = [list(group_registry.get_all_setting_groups())[0] for group_registry in (djsetting, registry)]
+        self.assertEqual([group.test_string for group in groups], ['default registry', 'features registry'])
+
+        djsetting.unregister(TestSettings)
+        self.assertEqual(registry.test_string, 'features registry')
+
+    def test_same_names_in_namespaces(self):
+        class TestSettings(DjSettingsGroup):
+            test_integer = values.IntegerValue(default=1)
+
+            class Meta:
+                storage = 'group'
+
+        registry = DjSettingsRegistry('a')
+        other_registry = DjSettingsRegistry('b')
+        registry.register(TestSettings)
+        other_registry.register(TestSettings)
+
+        registry.test_integer = 2
+        other_registry.set_many({'test_integer': 3}, other_registry.get_versions())
+
+        self.assertEqual(sorted(DjSetting.objects.values_list('name', flat=True)),
+                         ['a.group:TestSettings', 'b.group:TestSettings'])
+        self.assertEqual(registry.test_integer, 2)
+        self.assertEqual(other_registry.test_integer, 3)
+
+        with settings_snapshot():
+            self.assertEqual(get_snapshot(), {'a.test_integer': '2', 'b.test_integer': '3'})
+            self.assertEqual(registry.test_integer, 2)
+            self.assertEqual(other_registry.test_integer, 3)
+
+        with override_settings(DJSETTINGS_REGISTRY_CACHE=True):
+            self.assertEqual(registry.get_many(), {'test_integer': 2})
+            self.assertEqual(other_registry.get_many(), {'test_integer': 3})
+
+    def test_model_choice_in_namespaces(self):
+        class TestSettings(DjSettingsGroup):
+            test_model_choice = values.ModelChoiceValue(queryset=User.objects.all(), default=None)
+
+        user = User.objects.create_user('test')
+        other_user = User.objects.create_user('other')
+        djsetting.register(TestSettings)
+        registry = DjSettingsRegistry('features')
+        registry.register(TestSettings)
+
+        djsetting.test_model_choice = user
+        registry.test_model_choice = other_user
+
+        other_user.delete()
+        self.assertEqual(djsetting.test_model_choice, user)
+        self.assertIsNone(registry.test_model_choice)
+
+        # Settings of unregistered group are not reset anymore
+        user_pk = str(user.pk)
+        djsetting.unregister(TestSettings)
+        user.delete()
+        self.assertEqual(DjSetting.objects.get(name='test_model_choice').raw_value, user_pk)
+
+    def test_invalid_namespace(self):
+        for namespace in ('', 'a:b'):
+            with self.assertRaises(ValueError):
+                DjSettingsRegistry(namespace)
+
+    def test_registered_settings(self):
+        @djsetting.register
+        class TestSettings(DjSettingsGroup):
+            test_string = values.StringValue(default='test string')
+
+        registry = DjSettingsRegistry()
+
+        @registry.register
+        class TestOtherSettings(DjSettingsGroup):
+            test_integer = values.IntegerValue(default=1)
+
+        self.assertEqual(sorted(setting.name for setting in get_registered_settings()),
+                         ['test_integer', 'test_string'])
+
+        del registry
+        self.assertEqual([setting.name for setting in get_registered_settings()], ['test_string'])
+
+    def test_concurrent_register(self):
+        groups = []
+        for i in range(20):
+            groups.append(type(f'TestSettings{i}', (DjSettingsGroup,), {
+                '__module__': __name__,
+                f'test_integer_{i}': values.IntegerValue(default=i),
+            }))
+
+        threads = [threading.Thread(target=djsetting.register, args=(group,)) for group in groups]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(djsetting._get_registered_group_classes()), 20)
+        self.assertEqual(djsetting.get_many([f'test_integer_{i}' for i in range(20)]),
+                         {f'test_integer_{i}': i for i in range(20)})
+
+
+class TestGetMany(BaseTestCase):
+    def setUp(self):
+        super(TestGetMany, self).setUp()
+
+        @djsetting.register
+        class TestSettings(DjSettingsGroup):
+            test_string = values.StringValue(default='test string')
+            test_integer = values.IntegerValue(default=1)
+            test_decimal = values.DecimalValue(default=decimal.Decimal('1.01'))
+
+    def test_get_many(self):
+        self.assertEqual(djsetting.get_many(['test_string', 'test_integer']),
+                         {'test_string': 'test string', 'test_integer': 1})
+
+    def test_as_dict(self):
+        djsetting.test_integer = 2
+
+        self.assertEqual(djsetting.as_dict(), {
+            'test_string': 'test string',
+            'test_integer': 2,
+            'test_decimal': decimal.Decimal('1.01'),
+        })
+
+    def test_not_registered(self):
+        with self.assertRaises(SettingNotRegistered):
+            djsetting.get_many(['test_string', 'test_unknown'])
+
+    def test_defaults_not_stored(self):
+        with self.assertNumQueries(1):
+            djsetting.as_dict()
+
+        self.assertEqual(DjSetting.objects.count(), 0)
+
+        with self.assertNumQueries(0):
+            djsetting.as_dict()
+
+    def test_cache_misses_fetched_in_bulk(self):
+        djsetting.as_dict()
+        caches['default'].clear()
+        DjSetting.objects.create(name='test_integer', raw_value='3')
+
+        with self.assertNumQueries(1):
+            self.assertEqual(djsetting.as_dict()['test_integer'], 3)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(djsetting.test_integer, 3)
+
+
+class TestSetMany(BaseTestCase):
+    def setUp(self):
+        super(TestSetMany, self).setUp()
+
+        @djsetting.register
+        class TestSettings(DjSettingsGroup):
+            test_string = values.StringValue(default='test string')
+            test_integer = values.IntegerValue(default=1)
+
+    def test_set_many(self):
+        djsetting.test_string
+
+        djsetting.set_many({'test_string': 'test string updated', 'test_integer': 2})
+
+        self.assertEqual(dict(DjSetting.objects.values_list('name', 'raw_value')),
+                         {'test_string': 'test string updated', 'test_integer': '2'})
+
+        with self.assertNumQueries(0):
+            self.assertEqual(djsetting.as_dict(), {'test_string': 'test string updated', 'test_integer': 2})
+
+    def test_set_many_queries(self):
+        djsetting.as_dict()
+
+        # begin, select, bulk insert, change log insert, generation update and select
+        with self.assertNumQueries(6):
+            djsetting.set_many({'test_string': 'test string updated', 'test_integer': 2})
+
+    def test_invalid_value(self):
+        with self.assertRaises(InvalidSettingValue):
+            djsetting.set_many({'test_string': 'test string updated', 'test_integer': 'test'})
+
+        self.assertEqual(DjSetting.objects.count(), 0)
+
+
+class TestCompareAndSet(BaseTestCase):
+    def setUp(self):
+        super(TestCompareAndSet, self).setUp()
+
+        @djsetting.register
+        class TestSettings(DjSettingsGroup):
+            test_string = values.StringValue(default='test string')
+            test_integer = values.IntegerValue(default=1)
+
+    def test_set_without_read(self):
+        djsetting.test_integer = 2
+
+        # begin, update, change log insert, generation update and select
+        with self.assertNumQueries(5), mock.patch.object(caches['default'], 'get') as cache_get:
+            djsetting.test_integer = 3
+            cache_get.assert_not_called()
+
+        self.assertEqual(djsetting.test_integer, 3)
+
+    def test_versions(self):
+        self.assertEqual(djsetting.get_versions(), {'test_string': 0, 'test_integer': 0})
+
+        djsetting.test_integer = 2
+        djsetting.test_integer = 3
+        djsetting.set_many({'test_integer': 4, 'test_string': 'test string 2'})
+
+        self.assertEqual(djsetting.get_versions(['test_integer']), {'test_integer': 3})
+        self.assertEqual(djsetting.get_versions(['test_string']), {'test_string': 1})
+
+    def test_compare_and_set(self):
+        self.assertTrue(djsetting.compare_and_set('test_integer', 2, 0))
+        self.assertFalse(djsetting.compare_and_set('test_integer', 3, 0))
+        self.assertTrue(djsetting.compare_and_set('test_integer', 3, 1))
+        self.assertFalse(djsetting.compare_and_set('test_integer', 4, 1))
+
+        self.assertEqual(DjSetting.objects.get(name='test_integer').raw_value, '3')
+        self.assertEqual(djsetting.test_integer, 3)
+        self.assertEqual(djsetting.get_versions(['test_integer']), {'test_integer': 2})
+
+    def test_set_many_with_versions(self):
+        djsetting.test_integer = 2
+        versions = djsetting.get_versions()
+
+        self.assertTrue(djsetting.set_many({'test_integer': 3, 'test_string': 'test string 2'}, versions))
+        self.assertFalse(djsetting.set_many({'test_integer': 4, 'test_string': 'test string 3'}, versions))
+
+        self.assertEqual(dict(DjSetting.objects.values_list('name', 'raw_value')),
+                         {'test_integer': '3', 'test_string': 'test string 2'})
+        self.assertEqual(djsetting.as_dict(), {'test_integer': 3, 'test_string': 'test string 2'})
+
+    def test_lost_update_rolled_back(self):
+        djsetting.test_integer = 2
+        versions = djsetting.get_versions()
+        djsetting.test_string = 'test string 2'
+
+        self.assertFalse(djsetting.set_many({'test_integer': 3, 'test_string': 'test string 3'}, versions))
+
+        self.assertEqual(DjSetting.objects.get(name='test_integer').raw_value, '2')
+        self.assertEqual(djsetting.as_dict(), {'test_integer': 2, 'test_string': 'test string 2'})
+
+    def test_set_many_with_versions_queries(self):
+        djsetting.test_integer = 2
+        versions = djsetting.get_versions()
+
+        # begin, select for update, bulk update, bulk insert, change log insert, generation update and select
+        with self.assertNumQueries(7):
+            self.assertTrue(djsetting.set_many({'test_integer': 3, 'test_string': 'test string 2'}, versions))
+
+    def test_stored_concurrently(self):
+        versions = djsetting.get_versions()
+        bulk_create = DjSetting.objects.bulk_create
+
+        def create_concurrently(objs, **kwargs):
+            DjSetting.objects.create(name='test_string', raw_value='concurrent')
+            return bulk_create(objs, **kwargs)
+
+        with mock.patch.object(DjSetting.objects, 'bulk_create', side_effect=create_concurrently):
+            self.assertFalse(djsetting.set_many({'test_integer': 2, 'test_string': 'test string 2'}, versions))
+
+        # Row created in the same transaction in the test is rolled back with it
+        self.assertEqual(DjSetting.objects.count(), 0)
+
+
+
+async def run_inline(func, *args, **kwargs):
+    return func(*args, **kwargs)
+
+
+@mock.patch('djsettings.registries.sync_to_thread', side_effect=run_inline)
+@mock.patch('djsettings.values.sync_to_thread', side_effect=run_inline)
+class TestAsync(BaseTestCase):
+    def setUp(self):
+        super(TestAsync, self).setUp()
+
+        @djsetting.register
+        class TestSettings(DjSettingsGroup):
+            test_string = values.StringValue(default='test string')
+            test_integer = values.IntegerValue(default=1)
+
+        djsetting.test_integer = 2
+
+    def test_aget(self, values_sync_to_thread, registries_sync_to_thread):
+        self.assertEqual(asyncio.run(djsetting.aget('test_integer')), 2)
+        self.assertEqual(asyncio.run(djsetting.aget_many()), {'test_string': 'test string', 'test_integer': 2})
+        self.assertEqual(values_sync_to_thread.call_count, 2)
+
+    def test_not_registered(self, values_sync_to_thread, registries_sync_to_thread):
+        with self.assertRaises(SettingNotRegistered):
+            asyncio.run(djsetting.aget('test_unknown'))
+
+    def test_snapshot_hit_without_thread(self, values_sync_to_thread, registries_sync_to_thread):
+        djsetting.get_many()
+
+        with settings_snapshot(), self.assertNumQueries(0):
+            self.assertEqual(asyncio.run(djsetting.aget_many()), {'test_string': 'test string', 'test_integer': 2})
+        values_sync_to_thread.assert_not_called()
+
+    @override_settings(DJSETTINGS_LOCAL_CACHE=True)
+    def test_local_cache_hit_without_thread(self, values_sync_to_thread, registries_sync_to_thread):
+        djsetting.get_many()
+
+        with self.assertNumQueries(0):
+            self.assertEqual(asyncio.run(djsetting.aget('test_integer')), 2)
+        values_sync_to_thread.assert_not_called()
+
+    @override_settings(DJSETTINGS_REGISTRY_CACHE=True, DJSETTINGS_REGISTRY_CACHE_TIMEOUT=60)
+    def test_registry_cache_validated_in_thread(self, values_sync_to_thread, registries_sync_to_thread):
+        self.assertEqual(djsetting.test_integer, 2)
+
+        with mock.patch('djsettings.snapshots.time.monotonic', return_value=time.monotonic() + 60):
+            self.assertEqual(asyncio.run(djsetting.aget('test_integer')), 2)
+        values_sync_to_thread.assert_called_once()
+
+        values_sync_to_thread.reset_mock()
+        with self.assertNumQueries(0), mock.patch.object(caches['default'], 'get') as cache_get:
+            self.assertEqual(asyncio.run(djsetting.aget('test_integer')), 2)
+            cache_get.assert_not_called()
+        values_sync_to_thread.assert_not_called()
+
+    def test_shared_snapshot_checked_in_thread(self, values_sync_to_thread, registries_sync_to_thread):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'djsettings.snapshot')
+            SnapshotFile(path).write(1, {'test_integer': '3'})
+
+            with override_settings(DJSETTINGS_SHARED_SNAPSHOT_PATH=path, DJSETTINGS_SHARED_SNAPSHOT_CHECK_INTERVAL=60):
+                self.assertEqual(djsetting.test_integer, 3)
+
+                with mock.patch('djsettings.files.time.monotonic', return_value=time.monotonic() + 60):
+                    self.assertEqual(asyncio.run(djsetting.aget('test_integer')), 3)
+                values_sync_to_thread.assert_called_once()
+
+                values_sync_to_thread.reset_mock()
+                with mock.patch('djsettings.files.os.stat') as stat:
+                    self.assertEqual(asyncio.run(djsetting.aget('test_integer')), 3)
+                    stat.assert_not_called()
+                values_sync_to_thread.assert_not_called()
+
+    def test_not_decoded_in_thread(self, values_sync_to_thread, registries_sync_to_thread):
+        user = User.objects.create_user('test')
+
+        @djsetting.register
+        class TestModelSettings(DjSettingsGroup):
+            test_user = values.ModelChoiceValue(queryset=User.objects.all(), default=None, required=False)
+
+        djsetting.test_user = user
+
+        with settings_snapshot():
+            self.assertEqual(asyncio.run(djsetting.aget('test_user')), user)
+            values_sync_to_thread.assert_called_once()
+
+            values_sync_to_thread.reset_mock()
+            with self.assertNumQueries(0):
+                self.assertEqual(asyncio.run(djsetting.aget('test_user')), user)
+            values_sync_to_thread.assert_not_called()
+
+    def test_aset(self, values_sync_to_thread, registries_sync_to_thread):
+        asyncio.run(djsetting.aset('test_integer', 3))
+
+        self.assertEqual(DjSetting.objects.get(name='test_integer').raw_value, '3')
+        self.assertEqual(djsetting.test_integer, 3)
+
+        with self.assertRaises(InvalidSettingValue):
+            asyncio.run(djsetting.aset('test_integer', 'invalid'))
+
+    def test_aset_in_snapshot(self, values_sync_to_thread, registries_sync_to_thread):
+        async def set_and_get():
+            with settings_snapshot():
+                await djsetting.aset('test_string', 'test string 2')
+                return dict(get_snapshot())
+
+        self.assertEqual(asyncio.run(set_and_get()), {'test_integer': '2', 'test_string': 'test string 2'})
+
+
+class TestSyncToThread(BaseTestCase):
+    def test_sync_to_thread(self):
+        async def run():
+            with settings_snapshot():
+                return await sync_to_thread(lambda: (threading.get_ident(), get_snapshot()))
+
+        thread_id, snapshot = asyncio.run(run())
+
+        self.assertNotEqual(thread_id, threading.get_ident())
+        self.assertIsNotNone(snapshot)
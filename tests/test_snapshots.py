@@ -0,0 +1,462 @@
+import os
+import tempfile
+import threading
+import unittest
+from io import StringIO
+from unittest import mock
+
+from django.http import HttpResponse
+from django.core.cache import caches
+from django.core.management import call_command
+from django.db import OperationalError, transaction
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from djsettings import djsetting, DjSettingsGroup, values
+from djsettings import snapshots
+from djsettings.middleware import SettingsSnapshotMiddleware
+from djsettings.models import DjSetting, DjSettingChange
+from djsettings.files import SnapshotFile
+from djsettings.snapshots import (RegistryCache, SharedSnapshotPublisher, SnapshotFileReconciler, SnapshotRefresher,
+                                  get_registry_cache, get_snapshot, load_snapshot_file, set_snapshot,
+                                  settings_snapshot, start_reconciler, start_refresher, stop_reconciler,
+                                  stop_refresher)
+from djsettings.values import BaseValueType
+
+from .base import BaseTestCase
+
+
+class TestSnapshot(BaseTestCase):
+    def setUp(self):
+        super(TestSnapshot, self).setUp()
+
+        @djsetting.register
+        class TestSetting(DjSettingsGroup):
+            test_integer = values.IntegerValue(default=1)
+            test_string = values.StringValue(default='test')
+
+        djsetting.test_integer = 2
+
+        self.refresher = SnapshotRefresher(interval=1)
+        self.refresher.refresh()
+
+    def test_reads_served_from_snapshot(self):
+        self.assertEqual(dict(get_snapshot()), {'test_integer': '2'})
+
+        with self.assertNumQueries(0), mock.patch('djsettings.values.caches') as shared_caches:
+            self.assertEqual(djsetting.test_integer, 2)
+            self.assertEqual(djsetting.test_string, 'test')
+            self.assertEqual(djsetting.as_dict(), {'test_integer': 2, 'test_string': 'test'})
+            shared_caches.__getitem__.assert_not_called()
+
+    def test_changes_in_this_process(self):
+        djsetting.test_string = 'test 2'
+        djsetting.set_many({'test_integer': 3})
+
+        self.assertEqual(dict(get_snapshot()), {'test_integer': '3', 'test_string': 'test 2'})
+
+    def test_refresh(self):
+        djsetting.test_string = 'test 2'
+        set_snapshot({'test_integer': '2'})
+
+        with self.assertNumQueries(1):
+            self.refresher.refresh()
+        self.assertEqual(djsetting.test_string, 'test 2')
+
+
+class TestSettingsSnapshot(BaseTestCase):
+    def setUp(self):
+        super(TestSettingsSnapshot, self).setUp()
+
+        @djsetting.register
+        class TestSetting(DjSettingsGroup):
+            test_integer = values.IntegerValue(default=1)
+            test_string = values.StringValue(default='test')
+
+        djsetting.test_integer = 2
+
+    def test_reads_served_from_snapshot(self):
+        with settings_snapshot():
+            self.assertEqual(dict(get_snapshot()), {'test_integer': '2'})
+
+            with self.assertNumQueries(0), mock.patch('djsettings.values.caches') as shared_caches:
+                self.assertEqual(djsetting.test_integer, 2)
+                self.assertEqual(djsetting.test_string, 'test')
+                shared_caches.__getitem__.assert_not_called()
+
+        self.assertIsNone(get_snapshot())
+
+    def test_missing_settings_cached(self):
+        with settings_snapshot():
+            pass
+
+        with self.assertNumQueries(0), settings_snapshot():
+            self.assertEqual(djsetting.test_string, 'test')
+
+    def test_empty_snapshot(self):
+        DjSetting.objects.all().delete()
+        djsetting.invalidate()
+
+        with settings_snapshot():
+            with self.assertNumQueries(0):
+                self.assertEqual(djsetting.test_integer, 1)
+
+    def test_changes_made_elsewhere_not_visible(self):
+        with settings_snapshot():
+            DjSetting.objects.filter(name='test_integer').update(raw_value='3')
+            djsetting.invalidate()
+
+            self.assertEqual(djsetting.test_integer, 2)
+
+        self.assertEqual(djsetting.test_integer, 3)
+
+    def test_changes_in_block(self):
+        with settings_snapshot():
+            djsetting.test_string = 'test 2'
+            djsetting.set_many({'test_integer': 3})
+
+            with self.assertNumQueries(0):
+                self.assertEqual(djsetting.test_string, 'test 2')
+                self.assertEqual(djsetting.test_integer, 3)
+
+    def test_nested_blocks(self):
+        with settings_snapshot():
+            snapshot = get_snapshot()
+
+            with self.assertNumQueries(0), settings_snapshot():
+                self.assertIs(get_snapshot(), snapshot)
+
+            self.assertIs(get_snapshot(), snapshot)
+
+    def test_middleware(self):
+        def get_response(request):
+            self.assertEqual(dict(get_snapshot()), {'test_integer': '2'})
+            return HttpResponse(str(djsetting.test_integer))
+
+        middleware = SettingsSnapshotMiddleware(get_response)
+        response = middleware(RequestFactory().get('/'))
+
+        self.assertEqual(response.content, b'2')
+        self.assertIsNone(get_snapshot())
+
+
+@override_settings(DJSETTINGS_REGISTRY_CACHE=True, DJSETTINGS_REGISTRY_CACHE_TIMEOUT=None)
+class TestRegistryCache(BaseTestCase):
+    def setUp(self):
+        super(TestRegistryCache, self).setUp()
+
+        patcher = mock.patch.object(snapshots, '_registry_cache', None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        @djsetting.register
+        class TestSetting(DjSettingsGroup):
+            test_integer = values.IntegerValue(default=1)
+            test_string = values.StringValue(default='test')
+
+        djsetting.test_integer = 2
+
+    def test_steady_state_reads(self):
+        self.assertEqual(dict(get_snapshot()), {'test_integer': '2'})
+
+        with self.assertNumQueries(0), mock.patch('djsettings.values.caches') as shared_caches, \
+                mock.patch('djsettings.snapshots.caches') as registry_caches:
+            self.assertEqual(djsetting.test_integer, 2)
+            self.assertEqual(djsetting.test_string, 'test')
+            self.assertEqual(djsetting.as_dict(), {'test_integer': 2, 'test_string': 'test'})
+            shared_caches.__getitem__.assert_not_called()
+            registry_caches.__getitem__.assert_not_called()
+
+    def test_changes_in_this_process(self):
+        get_snapshot()
+        djsetting.set_many({'test_integer': 3, 'test_string': 'test 2'})
+
+        with self.assertNumQueries(0):
+            self.assertEqual(dict(get_snapshot()), {'test_integer': '3', 'test_string': 'test 2'})
+
+    def test_rolled_back_change(self):
+        registry_cache = get_registry_cache()
+        registry_cache.get()
+        generation = registry_cache.generation
+
+        with self.assertRaises(ValueError), transaction.atomic():
+            djsetting.test_integer = 3
+            raise ValueError
+
+        self.assertEqual(djsetting.test_integer, 2)
+        self.assertEqual(registry_cache.generation, generation)
+        self.assertEqual(caches['default'].get('djsettings_:registry'), (generation, {'test_integer': '2'}))
+
+    def test_validate(self):
+        registry_cache = get_registry_cache()
+        registry_cache.get()
+
+        with self.assertNumQueries(0), mock.patch.object(caches['default'], 'get',
+                                                         wraps=caches['default'].get) as cache_get:
+            registry_cache.validate()
+            self.assertEqual(cache_get.call_count, 1)
+
+    def test_changes_in_other_process(self):
+        other_cache = RegistryCache(timeout=None)
+        other_cache.get()
+
+        djsetting.test_string = 'test 2'
+
+        with self.assertNumQueries(0):
+            other_cache.validate()
+        self.assertEqual(dict(other_cache.get()), {'test_integer': '2', 'test_string': 'test 2'})
+
+    def test_outdated_blob_rebuilt(self):
+        registry_cache = get_registry_cache()
+        registry_cache.get()
+
+        DjSetting.objects.filter(name='test_integer').update(raw_value='3')
+        caches['default'].set('djsettings_:generation', registry_cache.generation + 1, None)
+
+        with self.assertNumQueries(1):
+            registry_cache.validate()
+        self.assertEqual(djsetting.test_integer, 3)
+
+    @override_settings(DJSETTINGS_REGISTRY_CACHE_TIMEOUT=0)
+    def test_timeout(self):
+        registry_cache = get_registry_cache()
+        registry_cache.get()
+
+        with mock.patch.object(RegistryCache, 'validate') as validate:
+            registry_cache.get()
+        validate.assert_called_once_with()
+
+
+class TestSharedSnapshot(BaseTestCase):
+    def setUp(self):
+        super(TestSharedSnapshot, self).setUp()
+
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'snapshot')
+
+        settings_override = override_settings(DJSETTINGS_SHARED_SNAPSHOT_PATH=self.path)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        @djsetting.register
+        class TestSetting(DjSettingsGroup):
+            test_integer = values.IntegerValue(default=1)
+            test_string = values.StringValue(default='test')
+
+        djsetting.test_integer = 2
+
+    def test_not_published(self):
+        self.assertIsNone(get_snapshot())
+        self.assertEqual(djsetting.test_integer, 2)
+
+    def test_reads_served_from_file(self):
+        SharedSnapshotPublisher(self.path, interval=1).refresh()
+
+        self.assertEqual(dict(get_snapshot()), {'test_integer': '2'})
+
+        with self.assertNumQueries(0), mock.patch('djsettings.values.caches') as shared_caches:
+            self.assertEqual(djsetting.test_integer, 2)
+            self.assertEqual(djsetting.test_string, 'test')
+            shared_caches.__getitem__.assert_not_called()
+
+    def test_publish(self):
+        publisher = SharedSnapshotPublisher(self.path, interval=1)
+        publisher.refresh()
+        generation = SnapshotFile(self.path).read_generation()
+
+        modified = os.stat(self.path).st_mtime - 60
+        os.utime(self.path, (modified, modified))
+
+        with self.assertNumQueries(1):
+            publisher.refresh()
+        self.assertEqual(SnapshotFile(self.path).read_generation(), generation)
+        # File is touched, so readers know the publisher is running
+        self.assertGreater(os.stat(self.path).st_mtime, modified)
+
+        djsetting.test_string = 'test 2'
+        publisher.refresh()
+        self.assertEqual(SnapshotFile(self.path).read(),
+                         (generation + 1, {'test_integer': '2', 'test_string': 'test 2'}))
+
+    def test_changes_in_this_process(self):
+        SharedSnapshotPublisher(self.path, interval=1).refresh()
+        get_snapshot()
+
+        djsetting.test_string = 'test 2'
+
+        self.assertEqual(dict(get_snapshot()), {'test_integer': '2', 'test_string': 'test 2'})
+
+    def test_command(self):
+        stdout = StringIO()
+        call_command('djsettings_publish_snapshot', once=True, stdout=stdout)
+
+        self.assertEqual(SnapshotFile(self.path).read()[1], {'test_integer': '2'})
+        self.assertIn('Published 1 settings', stdout.getvalue())
+
+
+class TestSnapshotFile(BaseTestCase):
+    def setUp(self):
+        super(TestSnapshotFile, self).setUp()
+
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'snapshot')
+        self.file = SnapshotFile(self.path)
+
+        settings_override = override_settings(DJSETTINGS_SNAPSHOT_FILE=self.path)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        @djsetting.register
+        class TestSetting(DjSettingsGroup):
+            test_integer = values.IntegerValue(default=1)
+            test_string = values.StringValue(default='test')
+
+    def test_written_on_sync(self):
+        djsetting.test_integer = 2
+        self.assertIsNone(self.file.read())
+
+        call_command('sync_djsettings', stdout=StringIO())
+
+        generation, raw_values = self.file.read()
+        self.assertEqual(raw_values, {'test_integer': '2', 'test_string': 'test'})
+        self.assertEqual(generation, DjSettingChange.objects.latest('id').id)
+
+    def test_updated_on_write(self):
+        call_command('sync_djsettings', stdout=StringIO())
+        generation = self.file.read_generation()
+
+        djsetting.test_integer = 2
+        djsetting.set_many({'test_string': 'test 2'})
+
+        self.assertEqual(self.file.read(), (generation, {'test_integer': '2', 'test_string': 'test 2'}))
+
+    def test_load(self):
+        self.assertFalse(load_snapshot_file(self.path))
+        self.file.write(1, {'test_integer': '2'})
+
+        self.assertTrue(load_snapshot_file(self.path))
+        with self.assertNumQueries(0):
+            self.assertEqual(djsetting.test_integer, 2)
+            self.assertEqual(djsetting.test_string, 'test')
+
+    def test_reconcile(self):
+        djsetting.test_string = 'test 2'
+        self.file.write(1, {'test_integer': '2'})
+        load_snapshot_file(self.path)
+
+        reconciler = SnapshotFileReconciler(self.path, interval=1)
+        with mock.patch('djsettings.changes.ChangeLogReplica._load', side_effect=OperationalError), \
+                self.assertLogs('djsettings', 'WARNING'):
+            reconciler.refresh()
+        self.assertEqual(djsetting.test_integer, 2)
+
+        reconciler.refresh()
+
+        self.assertIsNone(get_snapshot())
+        self.assertEqual(self.file.read()[1], {'test_string': 'test 2'})
+        self.assertEqual(djsetting.test_integer, 1)
+        self.assertEqual(djsetting.test_string, 'test 2')
+
+    def test_database_unreachable(self):
+        self.file.write(1, {'test_integer': '2'})
+
+        with mock.patch.object(BaseValueType, 'get_from_db', side_effect=OperationalError), \
+                self.assertLogs('djsettings', 'WARNING'):
+            self.assertEqual(djsetting.test_integer, 2)
+            self.assertEqual(djsetting.test_string, 'test')
+
+        with mock.patch.object(DjSetting.objects, 'filter', side_effect=OperationalError), \
+                self.assertLogs('djsettings', 'WARNING'):
+            self.assertEqual(djsetting.as_dict(), {'test_integer': 2, 'test_string': 'test'})
+
+        # Values read from the file are not cached
+        self.assertEqual(djsetting.test_integer, 1)
+
+    def test_database_unreachable_without_file(self):
+        with mock.patch.object(BaseValueType, 'get_from_db', side_effect=OperationalError):
+            with self.assertRaises(OperationalError):
+                djsetting.test_integer
+
+
+class TestSnapshotRefresher(SimpleTestCase):
+    def tearDown(self):
+        stop_refresher()
+        stop_reconciler()
+        set_snapshot(None)
+
+    def test_thread(self):
+        refreshed = threading.Event()
+
+        with mock.patch.object(SnapshotRefresher, 'refresh', side_effect=refreshed.set) as refresh:
+            refresher = start_refresher(interval=60)
+            self.assertIs(start_refresher(interval=60), refresher)
+            self.assertTrue(refreshed.wait(5))
+
+            stop_refresher()
+            refresh.assert_called_once_with()
+            self.assertFalse(refresher._thread.is_alive())
+
+    def test_refresh_error(self):
+        refreshed = threading.Event()
+
+        def refresh():
+            refreshed.set()
+            raise Exception
+
+        with mock.patch.object(SnapshotRefresher, 'refresh', side_effect=refresh), \
+                self.assertLogs('djsettings', 'ERROR'):
+            start_refresher(interval=60)
+            self.assertTrue(refreshed.wait(5))
+            stop_refresher()
+
+    def test_restarted_after_fork(self):
+        with mock.patch.object(SnapshotRefresher, 'refresh'):
+            refresher = start_refresher(interval=60)
+
+            snapshots._after_fork_in_child()
+
+            self.assertIsNot(snapshots._refresher, refresher)
+            self.assertEqual(snapshots._refresher.interval, 60)
+            refresher.stop()
+
+    def test_reconciler_restarted_after_fork(self):
+        with mock.patch.object(SnapshotFileReconciler, 'refresh'):
+            reconciler = start_reconciler('/tmp/snapshot', interval=60)
+            self.assertIs(start_reconciler('/tmp/snapshot', interval=60), reconciler)
+
+            snapshots._after_fork_in_child()
+
+            self.assertIsNot(snapshots._reconciler, reconciler)
+            self.assertEqual(snapshots._reconciler.file.path, '/tmp/snapshot')
+            self.assertEqual(snapshots._reconciler.interval, 60)
+            reconciler.stop()
+
+    def test_finished_reconciler_not_restarted_after_fork(self):
+        def refresh(self):
+            set_snapshot(None)
+            self._stopped.set()
+
+        with mock.patch.object(SnapshotFileReconciler, 'refresh', refresh):
+            reconciler = start_reconciler('/tmp/snapshot', interval=60)
+            reconciler._thread.join(5)
+
+            snapshots._after_fork_in_child()
+
+            self.assertIs(snapshots._reconciler, reconciler)
+
+    @unittest.skipUnless(hasattr(os, 'fork'), 'requires os.fork')
+    def test_reconciler_runs_in_forked_child(self):
+        set_snapshot({'test_string': 'stale'})
+
+        with mock.patch.object(SnapshotFileReconciler, 'refresh'):
+            reconciler = start_reconciler('/tmp/snapshot', interval=60)
+
+            pid = os.fork()
+            if pid == 0:
+                child_reconciler = snapshots._reconciler
+                os._exit(0 if child_reconciler is not reconciler and child_reconciler._thread.is_alive() else 1)
+
+            _, status = os.waitpid(pid, 0)
+
+        self.assertEqual(os.WEXITSTATUS(status), 0)
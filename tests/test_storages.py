@@ -0,0 +1,165 @@
+import json
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.core.management import call_command
+
+from djsettings import djsetting, DjSettingsGroup, values
+from djsettings.changes import ChangeLogReplica
+from djsettings.models import DjSetting
+
+from .base import BaseTestCase
+
+
+class TestGroupStorage(BaseTestCase):
+    def setUp(self):
+        super(TestGroupStorage, self).setUp()
+
+        @djsetting.register
+        class TestGroupSettings(DjSettingsGroup):
+            test_string = values.StringValue(default='test')
+            test_integer = values.IntegerValue(default=1)
+            test_user = values.ModelChoiceValue(queryset=User.objects.all(), default=None, required=False)
+
+            class Meta:
+                storage = 'group'
+
+        @djsetting.register
+        class TestSettings(DjSettingsGroup):
+            test_other = values.StringValue(default='other')
+
+    def get_stored(self):
+        return json.loads(DjSetting.objects.get(name='group:TestGroupSettings').raw_value)
+
+    def test_one_row(self):
+        djsetting.test_string = 'test 2'
+        djsetting.set_many({'test_integer': 2, 'test_other': 'other 2'})
+
+        self.assertEqual(self.get_stored(), {'test_string': 'test 2', 'test_integer': '2'})
+        self.assertEqual(set(DjSetting.objects.values_list('name', flat=True)),
+                         {'group:TestGroupSettings', 'test_other'})
+        self.assertEqual(djsetting.as_dict(), {'test_string': 'test 2', 'test_integer': 2, 'test_user': None,
+                                               'test_other': 'other 2'})
+
+    def test_group_read_with_one_cache_key(self):
+        djsetting.set_many({'test_string': 'test 2', 'test_integer': 2})
+        djsetting.invalidate()
+
+        with self.assertNumQueries(1):
+            self.assertEqual(djsetting.get_many(['test_string', 'test_integer']),
+                             {'test_string': 'test 2', 'test_integer': 2})
+
+        with self.assertNumQueries(0), mock.patch.object(caches['default'], 'get_many',
+                                                         wraps=caches['default'].get_many) as get_many:
+            self.assertEqual(djsetting.get_many(['test_string', 'test_integer']),
+                             {'test_string': 'test 2', 'test_integer': 2})
+            self.assertEqual(len(get_many.call_args[0][0]), 1)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(djsetting.test_integer, 2)
+
+    def test_single_read_loads_group(self):
+        djsetting.set_many({'test_string': 'test 2', 'test_integer': 2})
+        djsetting.invalidate()
+
+        with self.assertNumQueries(1):
+            self.assertEqual(djsetting.test_string, 'test 2')
+            self.assertEqual(djsetting.test_integer, 2)
+
+    def test_not_stored(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(djsetting.test_string, 'test')
+            self.assertEqual(djsetting.test_integer, 1)
+
+        self.assertFalse(DjSetting.objects.exists())
+
+    def test_versions(self):
+        versions = djsetting.get_versions(['test_string', 'test_integer'])
+        self.assertEqual(versions, {'test_string': 0, 'test_integer': 0})
+
+        self.assertTrue(djsetting.compare_and_set('test_string', 'test 2', 0))
+        self.assertFalse(djsetting.compare_and_set('test_integer', 2, 0))
+        self.assertEqual(djsetting.get_versions(['test_string', 'test_integer']),
+                         {'test_string': 1, 'test_integer': 1})
+
+        self.assertFalse(djsetting.set_many({'test_integer': 2}, versions))
+        self.assertTrue(djsetting.set_many({'test_integer': 2}, djsetting.get_versions()))
+        self.assertEqual(self.get_stored(), {'test_string': 'test 2', 'test_integer': '2'})
+
+    def test_change_log(self):
+        djsetting.test_string = 'test 2'
+        djsetting.test_other = 'other 2'
+
+        replica = ChangeLogReplica()
+        replica.refresh()
+        self.assertEqual(replica.raw_values, {'test_string': 'test 2', 'test_other': 'other 2'})
+
+        djsetting.test_integer = 2
+        replica.refresh()
+        self.assertEqual(replica.raw_values, {'test_string': 'test 2', 'test_integer': '2', 'test_other': 'other 2'})
+
+    def test_related_obj_deleted(self):
+        user = User.objects.create_user('test')
+        djsetting.set_many({'test_user': user, 'test_string': 'test 2'})
+
+        user.delete()
+
+        self.assertEqual(self.get_stored(), {'test_user': '', 'test_string': 'test 2'})
+        self.assertIsNone(djsetting.test_user)
+
+    def test_stale_related_obj_deleted(self):
+        user = User.objects.create_user('test')
+        other = User.objects.create_user('other')
+        djsetting.test_user = user
+
+        # Changed by other process, cached value is stale
+        DjSetting.objects.filter(name='group:TestGroupSettings').update(raw_value=f'{{"test_user": "{other.pk}"}}')
+        user.delete()
+
+        self.assertEqual(self.get_stored(), {'test_user': str(other.pk)})
+        self.assertEqual(djsetting.test_user, other)
+
+    def test_sync(self):
+        djsetting.test_string = 'test 2'
+
+        call_command('sync_djsettings', stdout=StringIO())
+
+        self.assertEqual(self.get_stored(), {'test_string': 'test 2', 'test_integer': '1', 'test_user': ''})
+        with self.assertNumQueries(0):
+            self.assertEqual(djsetting.as_dict(), {'test_string': 'test 2', 'test_integer': 1, 'test_user': None,
+                                                   'test_other': 'other'})
+
+    def test_delete_old_settings(self):
+        djsetting.test_string = 'test 2'
+        DjSetting.objects.create(name='group:OldSettings', raw_value='{"test_old": "old"}')
+
+        call_command('delete_old_settings')
+
+        self.assertEqual(list(DjSetting.objects.values_list('name', flat=True)), ['group:TestGroupSettings'])
+
+    def test_storage_name(self):
+        @djsetting.register
+        class TestNamedSettings(DjSettingsGroup):
+            test_named = values.StringValue(default='test')
+
+            class Meta:
+                storage = 'group'
+                storage_name = 'named'
+
+        djsetting.test_named = 'test 2'
+        self.assertEqual(DjSetting.objects.get(name='group:named').raw_value, '{"test_named": "test 2"}')
+
+    def test_invalid_options(self):
+        with self.assertRaises(ValueError):
+            class TestInvalidStorage(DjSettingsGroup):
+                class Meta:
+                    storage = 'invalid'
+
+        with self.assertRaises(ValueError):
+            class TestSettingCacheOptions(DjSettingsGroup):
+                test_cached = values.StringValue(default='test', cache_timeout=10)
+
+                class Meta:
+                    storage = 'group'
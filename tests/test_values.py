@@ -1,11 +1,20 @@
 import decimal
+from unittest import mock
 
 from django.contrib.auth.models import User
+from django.core import checks
 from django.core.cache import caches
+from django.db import connection
+from django.db.models import F
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
 
 from djsettings import djsetting, DjSettingsGroup, values
-from djsettings.models import DjSetting
-from djsettings.exceptions import InvalidSettingValue
+from djsettings.generations import get_generation, validate_local_cache
+from djsettings.models import DjSetting, DjSettingChange, DjSettingsGeneration
+from djsettings.checks import check_defaults
+from djsettings.exceptions import InvalidDefaultSettingValue, InvalidSettingValue
+from djsettings.snapshots import settings_snapshot
 
 from .base import BaseTestCase
 
@@ -15,11 +24,13 @@ class BaseTestValue:
         self.assertEqual(len(DjSetting.objects.filter(name=self.attr_name)), 0)
         self.assertEqual(getattr(djsetting, self.attr_name), self.default)
 
-        db_obj = DjSetting.objects.get(name=self.attr_name)
-
-        self.assertEqual(db_obj.value, self.default)
+        # reading doesn't create database row
+        self.assertEqual(len(DjSetting.objects.filter(name=self.attr_name)), 0)
         dj_setting = djsetting.get_setting(self.attr_name)
-        self.assertEqual(db_obj.raw_value, caches['default'].get(dj_setting._get_cache_key(self.attr_name)))
+        self.assertIs(caches['default'].get(dj_setting._get_cache_key(self.attr_name)), values.not_stored)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(getattr(djsetting, self.attr_name), self.default)
 
     def test_set_setting(self):
         setattr(djsetting, self.attr_name, self.new_value)
@@ -125,3 +136,258 @@ class TestModelChoiceValue(BaseTestCase, BaseTestValue):
     def test_default_obj_deleted(self):
         self.default.delete()
         self.assertEqual(getattr(djsetting, self.attr_name), None)
+
+    def test_other_obj_deleted(self):
+        other = User.objects.create_user('other')
+        setattr(djsetting, self.attr_name, self.new_value)
+
+        with CaptureQueriesContext(connection) as context:
+            other.delete()
+        self.assertFalse(any(DjSetting._meta.db_table in query['sql'] for query in context.captured_queries))
+
+        self.assertEqual(getattr(djsetting, self.attr_name), self.new_value)
+
+    def test_stale_cached_value_on_delete(self):
+        other = User.objects.create_user('other')
+        setattr(djsetting, self.attr_name, self.new_value)
+
+        # Changed by other process, cached value is stale
+        DjSetting.objects.filter(name=self.attr_name).update(raw_value=str(other.pk))
+        self.new_value.delete()
+
+        self.assertEqual(DjSetting.objects.get(name=self.attr_name).raw_value, str(other.pk))
+        self.assertNotEqual(DjSettingChange.objects.latest('id').raw_value, '')
+        self.assertEqual(getattr(djsetting, self.attr_name), other)
+
+    def test_stale_snapshot_on_delete(self):
+        other = User.objects.create_user('other')
+        setattr(djsetting, self.attr_name, self.new_value)
+        setting = djsetting.get_setting(self.attr_name)
+
+        with settings_snapshot():
+            # Changed by other process after snapshot was taken
+            DjSetting.objects.filter(name=self.attr_name).update(raw_value=str(other.pk))
+            setting.cache.set(setting.cache_key, str(other.pk), version=setting.cache_version)
+
+            other.delete()
+
+        self.assertEqual(DjSetting.objects.get(name=self.attr_name).raw_value, '')
+        self.assertEqual(getattr(djsetting, self.attr_name), None)
+
+    def test_bulk_delete(self):
+        setattr(djsetting, self.attr_name, self.new_value)
+        User.objects.bulk_create([User(username=f'bulk{i}') for i in range(10)])
+
+        User.objects.filter(username__startswith='bulk').delete()
+        self.assertEqual(getattr(djsetting, self.attr_name), self.new_value)
+
+        User.objects.exclude(pk=self.default.pk).delete()
+        self.assertEqual(getattr(djsetting, self.attr_name), None)
+
+    def test_no_queries_on_read(self):
+        self.assertEqual(getattr(djsetting, self.attr_name), self.default)
+
+        with self.assertNumQueries(0):
+            for _ in range(3):
+                self.assertEqual(getattr(djsetting, self.attr_name).username, self.default.username)
+
+    def test_obj_saved(self):
+        self.assertEqual(getattr(djsetting, self.attr_name).username, 'test')
+
+        self.default.username = 'test updated'
+        self.default.save()
+        self.assertEqual(getattr(djsetting, self.attr_name).username, 'test updated')
+
+    def test_referenced_obj_saved_bumps_generation(self):
+        other = User.objects.create_user('other')
+        generation = get_generation()
+
+        other.save()
+        self.assertEqual(get_generation(), generation)
+
+        # Default is referenced while setting is not stored
+        self.default.save()
+        self.assertEqual(get_generation(), generation + 1)
+
+        setattr(djsetting, self.attr_name, self.new_value)
+        self.new_value.save()
+        self.assertEqual(get_generation(), generation + 3)
+
+    def test_obj_saved_in_other_process(self):
+        validate_local_cache()
+        self.assertEqual(getattr(djsetting, self.attr_name).username, 'test')
+
+        # Other process saves referenced row and increases generation
+        User.objects.filter(pk=self.default.pk).update(username='test updated')
+        DjSettingsGeneration.objects.update(generation=F('generation') + 1)
+        caches['default'].delete('djsettings_:generation')
+
+        self.assertEqual(getattr(djsetting, self.attr_name).username, 'test')
+
+        validate_local_cache()
+        self.assertEqual(getattr(djsetting, self.attr_name).username, 'test updated')
+
+
+class TestLazyModelChoiceValue(TestModelChoiceValue):
+    def setUp(self):
+        super(TestModelChoiceValue, self).setUp()
+        self.default = User.objects.create_user('test')
+        self.attr_name = 'test_model_choice'
+        self.new_value = User.objects.create_user('test2')
+        self.invalid_value = 'test'
+
+        @djsetting.register
+        class TestSetting(DjSettingsGroup):
+            test_model_choice = values.ModelChoiceValue(queryset=User.objects.all(), default=self.default,
+                                                        cache_mode=values.ModelChoiceValue.CACHE_LAZY)
+
+    def test_pk_without_query(self):
+        getattr(djsetting, self.attr_name)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(getattr(djsetting, self.attr_name).pk, self.default.pk)
+
+    def test_invalid_cache_mode(self):
+        with self.assertRaises(ValueError):
+            values.ModelChoiceValue(queryset=User.objects.all(), default=None, cache_mode='invalid')
+
+
+class TestUncachedModelChoiceValue(BaseTestCase):
+    def setUp(self):
+        super(TestUncachedModelChoiceValue, self).setUp()
+        self.user = User.objects.create_user('test')
+
+        @djsetting.register
+        class TestSetting(DjSettingsGroup):
+            test_model_choice = values.ModelChoiceValue(queryset=User.objects.all(), default=None, required=False,
+                                                        cache_mode=None)
+
+    def test_fetched_on_every_read(self):
+        djsetting.test_model_choice = self.user
+        self.assertEqual(djsetting.test_model_choice.username, 'test')
+
+        # Changed by other process, without signals in this one
+        User.objects.filter(pk=self.user.pk).update(username='test updated')
+
+        with self.assertNumQueries(1):
+            self.assertEqual(djsetting.test_model_choice.username, 'test updated')
+
+
+class TestDecodedValue(BaseTestCase):
+    def setUp(self):
+        super(TestDecodedValue, self).setUp()
+
+        @djsetting.register
+        class TestSetting(DjSettingsGroup):
+            test_decimal = values.DecimalValue(default=decimal.Decimal('1.01'))
+
+    def test_raw_value_parsed_once_per_change(self):
+        djsetting.test_decimal = decimal.Decimal('1.02')
+
+        with mock.patch.object(values.DecimalValue, 'to_python', autospec=True,
+                               side_effect=values.DecimalValue.to_python) as to_python:
+            for _ in range(3):
+                self.assertEqual(djsetting.test_decimal, decimal.Decimal('1.02'))
+            self.assertEqual(to_python.call_count, 1)
+
+            djsetting.test_decimal = decimal.Decimal('1.05')
+            to_python.reset_mock()
+
+            for _ in range(3):
+                self.assertEqual(djsetting.test_decimal, decimal.Decimal('1.05'))
+            self.assertEqual(to_python.call_count, 1)
+
+
+class TestDefaultConversion(BaseTestCase):
+    def setUp(self):
+        super(TestDefaultConversion, self).setUp()
+        self.user = User.objects.create_user('test')
+
+        @djsetting.register
+        class TestSetting(DjSettingsGroup):
+            test_model_choice = values.ModelChoiceValue(queryset=User.objects.all(), default=self.user.pk)
+            test_decimal = values.DecimalValue(default=1.5)
+            test_integer = values.IntegerValue(default='7')
+            test_float = values.FloatValue(default=1)
+            test_boolean = values.BooleanValue(default=0)
+
+    def test_default_converted(self):
+        expected = {
+            'test_model_choice': self.user,
+            'test_decimal': decimal.Decimal('1.5'),
+            'test_integer': 7,
+            'test_float': 1.0,
+            'test_boolean': False,
+        }
+
+        for name, value in expected.items():
+            with self.subTest(name=name):
+                self.assertEqual(getattr(djsetting, name), value)
+                self.assertIs(type(getattr(djsetting, name)), type(value))
+
+        self.assertEqual(djsetting.as_dict(), expected)
+
+    def test_type_unchanged_when_stored(self):
+        default = djsetting.test_decimal
+        djsetting.test_decimal = default
+
+        self.assertIs(type(djsetting.test_decimal), type(default))
+        self.assertEqual(djsetting.test_decimal, default)
+
+    def test_default_decoded_once(self):
+        self.assertEqual(djsetting.test_model_choice, self.user)
+
+        with self.assertNumQueries(0):
+            self.assertIs(djsetting.test_model_choice, djsetting.test_model_choice)
+
+
+class TestValueMemory(BaseTestCase):
+    def test_slots(self):
+        for setting in (values.BooleanValue(default=True), values.StringValue(default='test'),
+                        values.DecimalValue(default=decimal.Decimal('1.01')), values.IntegerValue(default=1),
+                        values.FloatValue(default=1.01), values.ModelChoiceValue(queryset=User.objects.all(), default=None)):
+            self.assertFalse(hasattr(setting, '__dict__'), setting.__class__.__name__)
+
+    def test_form_field_not_kept(self):
+        setting = values.StringValue(default='test', max_length=10)
+
+        self.assertIsNot(setting.form_field, setting.form_field)
+        self.assertEqual(setting.form_field.max_length, 10)
+
+
+class TestDefaultValidation(BaseTestCase):
+    def test_eager_validation(self):
+        with self.assertRaises(InvalidDefaultSettingValue):
+            values.IntegerValue(default='test')
+
+    @override_settings(DJSETTINGS_LAZY_VALIDATION=True)
+    def test_lazy_validation(self):
+        @djsetting.register
+        class TestSetting(DjSettingsGroup):
+            test_integer = values.IntegerValue(default='test')
+
+        with self.assertRaises(InvalidDefaultSettingValue):
+            djsetting.test_integer
+
+    @override_settings(DJSETTINGS_LAZY_VALIDATION=True)
+    def test_lazy_model_choice(self):
+        user = User.objects.create_user('test')
+
+        with self.assertNumQueries(0):
+            setting = values.ModelChoiceValue(queryset=User.objects.all(), default=user.pk)
+
+        with self.assertNumQueries(1):
+            self.assertEqual(setting.default, user.pk)
+
+    @override_settings(DJSETTINGS_LAZY_VALIDATION=True)
+    def test_system_check(self):
+        @djsetting.register
+        class TestSetting(DjSettingsGroup):
+            test_integer = values.IntegerValue(default='test')
+            test_string = values.StringValue(default='test')
+
+        errors = check_defaults(None)
+
+        self.assertEqual([error.id for error in errors], ['djsettings.E001'])
+        self.assertIn('"test_integer"', errors[0].msg)
+        self.assertIn(check_defaults, checks.registry.registry.get_checks())